@@ -1,21 +1,31 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, g
 from flask_cors import CORS
 import google.generativeai as genai
 from duckduckgo_search import DDGS
 import requests
 import re
-import math
-import sympy
-from sympy import symbols, solve, simplify, diff, integrate
 from bs4 import BeautifulSoup
 import os
-import json
 import logging
 import sys
 import time
 import ssl
+import hashlib
+import io
+import hmac
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import urllib3
 from dotenv import load_dotenv
+from scheduler import create_default_scheduler, LaneFullError, LANE_CACHE, LANE_MATH, LANE_LLM
+from storage import create_knowledge_store, ERROR_ANSWER_PREFIX
+import extractive
+import math_engine
+import http_cache
+import json_codec
+from records import SearchResult, AskResponse, parse_fields
+from deadline import Deadline, DEADLINE_HEADER
+import profiling
+from cassette import create_cassette, SearchClientProxy, GeminiModelProxy, MODE_REPLAY, KIND_REQUEST
 
 # Load environment variables
 load_dotenv()
@@ -32,7 +42,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['ETag'])
+http_cache.init_app(app)
+json_codec.init_app(app)
 
 # API Key Gemini dari .env
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
@@ -43,17 +55,40 @@ ENABLE_SEARCH = os.getenv('ENABLE_SEARCH', 'true').lower() == 'true'
 ENABLE_MATH_SOLVER = os.getenv('ENABLE_MATH_SOLVER', 'true').lower() == 'true'
 ENABLE_WEB_SCRAPING = os.getenv('ENABLE_WEB_SCRAPING', 'true').lower() == 'true'
 AI_MODEL = os.getenv('AI_MODEL', 'gemini-2.0-flash')
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+UPSTREAM_WORKERS = int(os.getenv('UPSTREAM_WORKERS', '16'))
+KNOWLEDGE_DB = os.getenv('KNOWLEDGE_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge_base.db'))
+
+# Umur maksimal jawaban tersimpan; pertanyaan berita/real-time kedaluwarsa lebih cepat
+# (KB_ANSWER_TTL_HOURS dan KB_MIN_CONFIDENCE dibaca oleh create_knowledge_store)
+KB_REALTIME_TTL_S = int(float(os.getenv('KB_REALTIME_TTL_HOURS', '3')) * 3600)
+REALTIME_QUESTION = re.compile(
+    r'\b(?:berita|terbaru|terkini|hari ini|kemarin|besok|sekarang|saat ini|minggu ini|bulan ini|tahun ini'
+    r'|harga|kurs|cuaca|skor|klasemen|jadwal|live|news|today|latest|current|price|weather|20\d\d)\b',
+    re.IGNORECASE
+)
 
 logger.info(f"🔑 API Key Status: {'✅ Loaded' if GEMINI_API_KEY else '❌ Not Found'}")
 
 class AdvancedAISystem:
-    def __init__(self):
+    def __init__(self, knowledge_store=None, cassette=None):
         self.gemini_model = None
         self.search_client = None
+        self.knowledge_store = knowledge_store
+        self.cassette = cassette
+        # Pool untuk panggilan search/Gemini yang dibatasi deadline
+        self.upstream_pool = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS, thread_name_prefix='upstream')
         self._initialize_services()
     
     def _initialize_services(self):
         """Initialize semua services dengan error handling yang diperbaiki"""
+        # Mode replay: semua upstream dilayani dari cassette, tanpa network
+        if self.cassette and self.cassette.mode == MODE_REPLAY:
+            self.gemini_model = GeminiModelProxy(self.cassette)
+            self.search_client = SearchClientProxy(self.cassette)
+            logger.info("📼 Gemini AI & DuckDuckGo Search served from cassette (replay)")
+            return
+        
         # Initialize Gemini AI - GUNAKAN MODEL YANG TERSEDIA
         try:
             if GEMINI_API_KEY and len(GEMINI_API_KEY) > 10:
@@ -100,6 +135,13 @@ class AdvancedAISystem:
         except Exception as e:
             logger.error(f"❌ DuckDuckGo Search Initialization Failed: {e}")
             self.search_client = None
+        
+        # Mode record: bungkus client asli supaya setiap panggilan terekam
+        if self.cassette:
+            if self.gemini_model:
+                self.gemini_model = GeminiModelProxy(self.cassette, self.gemini_model)
+            if self.search_client:
+                self.search_client = SearchClientProxy(self.cassette, self.search_client)
     
     def enhanced_search_duckduckgo(self, query, max_results=8):
         """Pencarian real-time yang lebih komprehensif dari DuckDuckGo"""
@@ -112,31 +154,31 @@ class AdvancedAISystem:
             try:
                 text_results = list(self.search_client.text(query, max_results=max_results))
                 for r in text_results:
-                    all_results.append({
-                        "type": "web",
-                        "title": r.get("title", "No Title"),
-                        "url": r.get("href", "#"),
-                        "snippet": r.get("body", "No description")[:250] + "...",
-                        "relevance": self._calculate_relevance(query, r.get("title", "") + " " + r.get("body", ""))
-                    })
+                    all_results.append(SearchResult(
+                        type="web",
+                        title=r.get("title", "No Title"),
+                        url=r.get("href", "#"),
+                        snippet=r.get("body", "No description")[:250] + "...",
+                        relevance=self._calculate_relevance(query, r.get("title", "") + " " + r.get("body", ""))
+                    ))
             except Exception as text_error:
                 logger.warning(f"⚠️ Text search failed: {text_error}")
             
             try:
                 news_results = list(self.search_client.news(query, max_results=3))
                 for r in news_results:
-                    all_results.append({
-                        "type": "news",
-                        "title": r.get("title", "No Title"),
-                        "url": r.get("url", "#"),
-                        "snippet": r.get("body", "No description")[:200] + "...",
-                        "relevance": self._calculate_relevance(query, r.get("title", "") + " " + r.get("body", ""))
-                    })
+                    all_results.append(SearchResult(
+                        type="news",
+                        title=r.get("title", "No Title"),
+                        url=r.get("url", "#"),
+                        snippet=r.get("body", "No description")[:200] + "...",
+                        relevance=self._calculate_relevance(query, r.get("title", "") + " " + r.get("body", ""))
+                    ))
             except Exception as news_error:
                 logger.warning(f"⚠️ News search failed: {news_error}")
             
             # Sort by relevance
-            all_results.sort(key=lambda x: x["relevance"], reverse=True)
+            all_results.sort(key=lambda x: x.relevance, reverse=True)
             return all_results[:max_results]
             
         except Exception as e:
@@ -151,64 +193,9 @@ class AdvancedAISystem:
         return len(common_words) / len(query_words) if query_words else 0
     
     def solve_math_problem(self, problem):
-        """Solver matematika yang powerful"""
+        """Solver matematika: aritmatika, persamaan, kalkulus, geometri, konversi satuan"""
         try:
-            problem_lower = problem.lower()
-            
-            # Basic arithmetic
-            if any(op in problem for op in ['+', '-', '*', '/', '^']):
-                # Remove text and keep only math expression
-                math_expr = re.sub(r'[^\d+\-*/().^]', '', problem)
-                if math_expr:
-                    result = eval(math_expr.replace('^', '**'))
-                    return f"**Jawaban Matematika:**\n\n`{problem}` = `{result}`"
-            
-            # Algebra
-            if any(word in problem_lower for word in ['x=', 'y=', 'solve', 'persamaan']):
-                x = symbols('x')
-                y = symbols('y')
-                
-                # Extract equation
-                if '=' in problem:
-                    parts = problem.split('=')
-                    if len(parts) == 2:
-                        left = parts[0].strip()
-                        right = parts[1].strip()
-                        equation = f"{left} - ({right})"
-                        solutions = solve(equation, x)
-                        if solutions:
-                            return f"**Solusi Persamaan:**\n\n`{problem}`\n\n**x = {solutions}**"
-            
-            # Calculus
-            if any(word in problem_lower for word in ['turunan', 'derivative', 'integral']):
-                x = symbols('x')
-                if 'turunan' in problem_lower or 'derivative' in problem_lower:
-                    # Extract function
-                    func_match = re.search(r'[fd]\(x\)\s*=\s*([^,\n]+)', problem)
-                    if func_match:
-                        func_str = func_match.group(1)
-                        derivative = diff(func_str, x)
-                        return f"**Turunan:**\n\nf(x) = {func_str}\n\nf'(x) = {derivative}"
-                
-                if 'integral' in problem_lower:
-                    func_match = re.search(r'∫\s*([^dx]+)\s*dx', problem)
-                    if func_match:
-                        func_str = func_match.group(1)
-                        integral = integrate(func_str, x)
-                        return f"**Integral:**\n\n∫ {func_str} dx = {integral} + C"
-            
-            # Geometry
-            if any(word in problem_lower for word in ['luas', 'volume', 'keliling', 'segitiga', 'lingkaran']):
-                if 'lingkaran' in problem_lower and 'jari' in problem_lower:
-                    radius_match = re.search(r'jari[-\s]*jari\s*=\s*(\d+)', problem_lower)
-                    if radius_match:
-                        r = float(radius_match.group(1))
-                        luas = math.pi * r * r
-                        keliling = 2 * math.pi * r
-                        return f"**Lingkaran (r={r}):**\n\n- Luas = π × r² = {luas:.2f}\n- Keliling = 2 × π × r = {keliling:.2f}"
-            
-            return None
-            
+            return math_engine.solve_problem(problem)
         except Exception as e:
             logger.error(f"Math solver error: {e}")
             return None
@@ -224,20 +211,28 @@ class AdvancedAISystem:
             session = requests.Session()
             session.verify = False
             
-            response = session.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Ambil konten utama
-            title = soup.title.string if soup.title else "No Title"
-            
-            # Hapus script dan style
-            for script in soup(["script", "style"]):
-                script.decompose()
+            with profiling.stage('fetch'):
+                if self.cassette:
+                    page = self.cassette.call(
+                        'http.get', {"url": url},
+                        lambda: session.get(url, headers=headers, timeout=10).text)
+                else:
+                    page = session.get(url, headers=headers, timeout=10).content
             
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            content = ' '.join(chunk for chunk in chunks if chunk)
+            with profiling.stage('parse_html'):
+                soup = BeautifulSoup(page, 'html.parser')
+                
+                # Ambil konten utama
+                title = soup.title.string if soup.title else "No Title"
+                
+                # Hapus script dan style
+                for script in soup(["script", "style"]):
+                    script.decompose()
+                
+                text = soup.get_text()
+                lines = (line.strip() for line in text.splitlines())
+                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+                content = ' '.join(chunk for chunk in chunks if chunk)
             
             return {
                 "title": title,
@@ -252,41 +247,45 @@ class AdvancedAISystem:
             return self.get_fallback_response(prompt, None, [])
         
         try:
-            # Enhanced prompt untuk hasil yang lebih baik
-            enhanced_prompt = f"""
-            Anda adalah asisten AI yang sangat pintar dan membantu. 
-            
-            CONTEXT/SEARCH RESULTS:
-            {context}
-            
-            USER QUESTION: {prompt}
-            
-            INSTRUCTIONS:
-            1. Berikan jawaban yang akurat dan informatif
-            2. Jika ada informasi dari search results, gunakan sebagai referensi
-            3. Jika pertanyaan tentang matematika, berikan penjelasan step-by-step
-            4. Format jawaban dengan rapi menggunakan Markdown
-            5. Untuk konsep kompleks, berikan contoh sederhana
-            6. Sertakan sumber referensi jika tersedia
-            
-            JAWABAN:
-            """
-            
-            # Generate content dengan config yang benar
-            response = self.gemini_model.generate_content(
-                enhanced_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.3,
-                    max_output_tokens=1500,
-                    top_p=0.8,
-                )
-            )
-            return response.text
+            return self._generate_gemini_answer(prompt, context)
         except Exception as e:
             logger.error(f"Gemini API error: {e}")
             return self.get_fallback_response(prompt, None, [])
     
-    def get_fallback_response(self, question, math_answer, search_results):
+    def _generate_gemini_answer(self, prompt, context=""):
+        """Panggil Gemini; exception diteruskan ke pemanggil"""
+        # Enhanced prompt untuk hasil yang lebih baik
+        enhanced_prompt = f"""
+        Anda adalah asisten AI yang sangat pintar dan membantu. 
+        
+        CONTEXT/SEARCH RESULTS:
+        {context}
+        
+        USER QUESTION: {prompt}
+        
+        INSTRUCTIONS:
+        1. Berikan jawaban yang akurat dan informatif
+        2. Jika ada informasi dari search results, gunakan sebagai referensi
+        3. Jika pertanyaan tentang matematika, berikan penjelasan step-by-step
+        4. Format jawaban dengan rapi menggunakan Markdown
+        5. Untuk konsep kompleks, berikan contoh sederhana
+        6. Sertakan sumber referensi jika tersedia
+        
+        JAWABAN:
+        """
+        
+        # Generate content dengan config yang benar
+        response = self.gemini_model.generate_content(
+            enhanced_prompt,
+            generation_config=genai.types.GenerationConfig(
+                temperature=0.3,
+                max_output_tokens=1500,
+                top_p=0.8,
+            )
+        )
+        return response.text
+    
+    def get_fallback_response(self, question, math_answer, search_results, page_contents=None):
         """Generate fallback response tanpa Gemini AI"""
         response = "🤖 **Mimin AI Enhanced**\n\n"
         
@@ -294,24 +293,35 @@ class AdvancedAISystem:
             response += f"{math_answer}\n\n"
         
         if search_results:
+            # Ringkasan ekstraktif dari snippet (dan isi halaman jika sudah diambil)
+            page_contents = page_contents or {}
+            documents = [
+                {
+                    "title": r.title,
+                    "url": r.url,
+                    "text": r.snippet + " " + page_contents.get(r.url, "")
+                }
+                for r in search_results
+            ]
+            summary = extractive.summarize(question, documents, max_sentences=3)
+            if summary:
+                response += "**💡 Ringkasan:**\n"
+                response += ' '.join(f"{sentence} [{doc_index + 1}]" for sentence, doc_index, _ in summary)
+                response += "\n\n"
+            
+            # Tampilkan 3 hasil teratas ditambah sumber lain yang dikutip di ringkasan
+            cited = {doc_index for _, doc_index, _ in summary}
             response += "**🔍 Hasil Penelusuran Terkini:**\n"
-            for i, result in enumerate(search_results[:3], 1):
-                response += f"{i}. **{result['title']}**\n"
-                response += f"   {result['snippet']}\n"
-                response += f"   📎 {result['url']}\n\n"
-            
-            # Tambahkan analisis sederhana berdasarkan hasil pencarian
-            response += "**💡 Analisis Berdasarkan Hasil Penelusuran:**\n"
-            topics = set()
-            for result in search_results[:2]:
-                # Extract keywords sederhana
-                words = result['title'].lower().split() + result['snippet'].lower().split()
-                for word in words:
-                    if len(word) > 4 and word not in ['dengan', 'yang', 'dari', 'pada', 'untuk']:
-                        topics.add(word)
-            
+            for i, result in enumerate(search_results, 1):
+                if i > 3 and (i - 1) not in cited:
+                    continue
+                response += f"{i}. **{result.title}**\n"
+                response += f"   {result.snippet}\n"
+                response += f"   📎 {result.url}\n\n"
+            
+            topics = extractive.key_terms(question, documents, limit=5)
             if topics:
-                response += f"Topik terkait: {', '.join(list(topics)[:5])}\n"
+                response += f"**🏷️ Topik terkait:** {', '.join(topics)}\n"
         else:
             response += "**📝 Informasi:**\n"
             response += "Fitur pencarian sedang tidak tersedia. "
@@ -321,74 +331,277 @@ class AdvancedAISystem:
         
         return response
     
-    def process_question(self, question):
-        """Proses pertanyaan dengan kemampuan enhanced"""
+    def _question_hash(self, question):
+        """Hash pertanyaan yang sudah dinormalisasi (huruf kecil, spasi tunggal)"""
+        normalized = ' '.join(question.lower().split())
+        return hashlib.md5(normalized.encode('utf-8')).hexdigest()
+    
+    def _answer_ttl(self, question):
+        """TTL jawaban tersimpan (detik) untuk pertanyaan ini; None = TTL default knowledge store"""
+        return KB_REALTIME_TTL_S if REALTIME_QUESTION.search(question) else None
+    
+    def get_cached_answer(self, question):
+        """Ambil jawaban dari tabel knowledge jika pertanyaan sudah pernah dijawab"""
+        if not self.knowledge_store:
+            return None
+        question_hash = self._question_hash(question)
+        try:
+            row = self.knowledge_store.get_knowledge(
+                question_hash, max_age_s=self._answer_ttl(question))
+        except Exception as e:
+            logger.warning(f"⚠️ Knowledge cache lookup failed: {e}")
+            return None
+        if not row:
+            return None
+        
+        # usage_count/last_used ditulis oleh writer thread secara batch
+        self.knowledge_store.record_usage(question_hash)
+        
+        answer, sources, _, created_at = row
+        search_results = [SearchResult.from_dict(r) for r in json_codec.loads(sources)] if sources else []
+        return AskResponse(
+            success=True,
+            question=question,
+            answer=answer,
+            search_results=search_results,
+            sources_count=len(search_results),
+            math_solved=False,
+            ai_available=self.gemini_model is not None,
+            search_available=self.search_client is not None,
+            enhanced_features=True,
+            cached=True,
+            answered_at=created_at
+        )
+    
+    def remember_answer(self, question, answer, search_results, confidence=0.9):
+        """Simpan jawaban Gemini ke tabel knowledge untuk penanya berikutnya.
+        
+        Mengembalikan created_at baris tersebut, atau None jika tidak disimpan.
+        """
+        if not self.knowledge_store or answer.startswith(ERROR_ANSWER_PREFIX):
+            return None
+        return self.knowledge_store.save_knowledge(
+            self._question_hash(question), question, answer,
+            json_codec.dumps_text(search_results), confidence
+        )
+    
+    def is_math_only(self, question):
+        """Cek apakah pertanyaan hanya berisi aritmatika satu baris"""
+        return math_engine.is_arithmetic_only(question)
+    
+    def answer_math_only(self, question, deadline=None):
+        """Jawab pertanyaan aritmatika tanpa pencarian web maupun Gemini"""
+        math_answer = self.solve_math_problem(question)
+        if not math_answer:
+            # Jangan jatuh ke search/Gemini di worker lane math: antrian LLM tidak boleh
+            # menahan lane ini. Ekspresi aritmatika murni yang gagal (1/0, angka terlalu
+            # besar, sintaks tak didukung) tidak akan dijawab lebih baik oleh pencarian web.
+            return AskResponse(
+                success=True,
+                question=question,
+                answer=f"🧮 **Tidak dapat dihitung:** `{question}`\n\n"
+                       "Ekspresi tidak valid atau hasilnya di luar batas (mis. pembagian dengan nol "
+                       "atau angka terlalu besar).",
+                sources_count=0,
+                math_solved=False,
+                ai_available=self.gemini_model is not None,
+                search_available=self.search_client is not None,
+                enhanced_features=True
+            )
+        return AskResponse(
+            success=True,
+            question=question,
+            answer=math_answer,
+            sources_count=0,
+            math_solved=True,
+            ai_available=self.gemini_model is not None,
+            search_available=self.search_client is not None,
+            enhanced_features=True
+        )
+    
+    def route_question(self, question):
+        """Tentukan lane scheduler: cache hit, matematika saja, atau search/LLM"""
+        cached = self.get_cached_answer(question)
+        if cached:
+            return LANE_CACHE, cached
+        if self.is_math_only(question):
+            return LANE_MATH, None
+        return LANE_LLM, None
+    
+    def _call_with_deadline(self, deadline, stage, fn, *args):
+        """Jalankan fn di upstream pool dan tunggu sampai deadline.
+        
+        Mengembalikan (future, selesai); tanpa deadline fn dijalankan langsung.
+        """
+        if deadline is None:
+            future = Future()
+            try:
+                with profiling.stage(stage):
+                    future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future, True
+        
+        future = self.upstream_pool.submit(profiling.bind(fn, stage), *args)
         try:
-            # Cek apakah ini pertanyaan matematika
-            math_keywords = ['hitung', 'berapa', 'matematika', 'kalkulus', 'aljabar', 'geometri', 
-                           'turunan', 'integral', 'persamaan', 'segitiga', 'lingkaran', 'volume', 'luas']
+            future.result(timeout=deadline.remaining())
+            return future, True
+        except FutureTimeoutError:
+            return future, False
+        except Exception:
+            # Error dari fn tetap tersimpan di future
+            return future, True
+    
+    def _compose_answer(self, math_answer, ai_response):
+        # Jika ada jawaban matematika, tambahkan di awal
+        if math_answer:
+            return f"{math_answer}\n\n---\n\n**Penjelasan Tambahan:**\n{ai_response}"
+        return ai_response
+    
+    def _remember_late_answer(self, question, math_answer, search_results, future):
+        """Callback: jawaban Gemini yang terlambat tetap disimpan untuk penanya berikutnya"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.remember_answer(question, self._compose_answer(math_answer, future.result()), search_results)
+        logger.info(f"💾 Late Gemini answer cached: {question[:50]}")
+    
+    def process_question(self, question, remember=True, deadline=None):
+        """Proses pertanyaan dengan kemampuan enhanced
+        
+        Jika deadline diberikan, search dan Gemini hanya ditunggu sampai batas
+        waktu; setelah itu jawaban terbaik yang ada dikembalikan dengan
+        partial=True.
+        """
+        try:
+            partial = False
             
-            is_math_question = any(keyword in question.lower() for keyword in math_keywords)
+            # Cek apakah ini pertanyaan matematika (lookup trigger aturan, satu kali scan)
+            is_math_question = ENABLE_MATH_SOLVER and math_engine.has_math_intent(question)
             
             # Solve math problem first
             math_answer = None
             if is_math_question:
-                math_answer = self.solve_math_problem(question)
+                with profiling.stage('math'):
+                    math_answer = self.solve_math_problem(question)
             
             # Lakukan pencarian web
-            search_results = self.enhanced_search_duckduckgo(question)
+            with profiling.stage('wait_search'):
+                search_future, search_done = self._call_with_deadline(
+                    deadline, 'search', self.enhanced_search_duckduckgo, question)
+            if search_done:
+                search_results = search_future.result()
+            else:
+                logger.warning(f"⏱️ Search exceeded deadline: {question[:50]}")
+                search_results = []
+                partial = True
             
             # Dapatkan jawaban AI atau fallback
-            if self.gemini_model:
+            gemini_answered = False
+            ai_response = None
+            if self.gemini_model and not partial:
                 # Gabungkan konteks untuk Gemini
                 full_context = ""
                 if search_results:
-                    search_summary = "\n".join([f"• {r['title']}: {r['snippet']}" for r in search_results[:4]])
+                    search_summary = "\n".join([f"• {r.title}: {r.snippet}" for r in search_results[:4]])
                     full_context += f"HASIL PENELUSURAN:\n{search_summary}"
                 
-                ai_response = self.get_gemini_response(question, full_context)
-                
-                # Jika ada jawaban matematika, tambahkan di awal
-                if math_answer:
-                    ai_response = f"{math_answer}\n\n---\n\n**Penjelasan Tambahan:**\n{ai_response}"
-            else:
-                # Gunakan fallback response tanpa Gemini
-                ai_response = self.get_fallback_response(question, math_answer, search_results)
+                with profiling.stage('wait_llm'):
+                    gemini_future, gemini_done = self._call_with_deadline(
+                        deadline, 'llm', self._generate_gemini_answer, question, full_context)
+                if not gemini_done:
+                    logger.warning(f"⏱️ Gemini exceeded deadline, returning partial answer: {question[:50]}")
+                    partial = True
+                    if remember:
+                        gemini_future.add_done_callback(
+                            lambda f: self._remember_late_answer(question, math_answer, search_results, f))
+                elif gemini_future.exception() is not None:
+                    logger.error(f"Gemini API error: {gemini_future.exception()}")
+                else:
+                    ai_response = self._compose_answer(math_answer, gemini_future.result())
+                    gemini_answered = True
+            
+            if ai_response is None:
+                # Gunakan fallback response (ringkasan extractive) tanpa Gemini
+                with profiling.stage('fallback'):
+                    ai_response = self.get_fallback_response(question, math_answer, search_results)
+            
+            result = AskResponse(
+                success=True,
+                question=question,
+                answer=ai_response,
+                search_results=search_results,
+                sources_count=len(search_results),
+                math_solved=math_answer is not None,
+                ai_available=self.gemini_model is not None,
+                search_available=self.search_client is not None,
+                enhanced_features=True,
+                partial=partial,
+                gemini_answered=gemini_answered,
+                elapsed_ms=deadline.elapsed_ms() if deadline is not None else None
+            )
             
-            return {
-                "success": True,
-                "question": question,
-                "answer": ai_response,
-                "search_results": search_results,
-                "sources_count": len(search_results),
-                "math_solved": math_answer is not None,
-                "ai_available": self.gemini_model is not None,
-                "search_available": self.search_client is not None,
-                "enhanced_features": True
-            }
+            # Hanya jawaban Gemini yang disimpan, jawaban fallback tidak di-cache
+            if gemini_answered and remember:
+                result.answered_at = self.remember_answer(question, ai_response, search_results)
+            
+            return result
             
         except Exception as e:
             logger.error(f"❌ Process question error: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "question": question,
-                "answer": f"❌ **System Error:** {str(e)}",
-                "search_results": []
-            }
+            return AskResponse(
+                success=False,
+                error=str(e),
+                question=question,
+                answer=f"❌ **System Error:** {str(e)}"
+            )
+
+# Initialize knowledge base & AI System
+knowledge_store = create_knowledge_store(KNOWLEDGE_DB)
+cassette = create_cassette()
+ai_system = AdvancedAISystem(knowledge_store, cassette)
+
+# Scheduler dengan lane terpisah agar pertanyaan murah tidak antri di belakang Gemini
+scheduler = create_default_scheduler()
 
-# Initialize AI System
-ai_system = AdvancedAISystem()
+@app.before_request
+def start_profiling():
+    """Profiling opt-in: header X-Profile: 1 (admin) atau sampling 1 dari N request"""
+    if request.endpoint == 'ask_question':
+        forced = request.headers.get(profiling.PROFILE_HEADER) == '1' and is_admin_request()
+        g.profile = profiling.start('ask', forced=forced)
+
+@app.teardown_request
+def stop_profiling(exc):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profiling.finish(profile)
+
+@app.after_request
+def add_profile_header(response):
+    profile = g.get('profile')
+    if profile is not None:
+        response.headers['X-Profile-Id'] = profile.id
+    return response
 
 @app.route('/api/ask', methods=['POST', 'GET'])
 def ask_question():
     """Endpoint untuk menanyakan pertanyaan"""
     try:
+        # fields=answer,sources_count: klien yang tidak menampilkan search_results bisa melewatinya
         if request.method == 'GET':
             question = request.args.get('question', '').strip()
+            fields = request.args.get('fields')
         else:
             data = request.get_json() or {}
             question = data.get('question', '').strip()
+            fields = data['fields'] if 'fields' in data else request.args.get('fields')
+        try:
+            selected = parse_fields(fields)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
         
         if not question:
             return jsonify({
@@ -396,9 +609,70 @@ def ask_question():
                 "error": "Pertanyaan tidak boleh kosong"
             }), 400
         
+        deadline = Deadline.from_header(request.headers.get(DEADLINE_HEADER))
         logger.info(f"📨 Received question: {question}")
-        result = ai_system.process_question(question)
-        return jsonify(result)
+        tenant = request.headers.get('X-Session-Id') or request.remote_addr
+
+        # Lookup knowledge base berjalan di lane cache, jadi concurrency baca DB ikut dibatasi
+        # lane tersebut; waktu menunggu di antrian lane juga dibatasi deadline request
+        lane, cached = scheduler.run(LANE_CACHE, profiling.bind(ai_system.route_question, 'route'),
+                                     question, tenant=tenant, timeout=deadline.remaining(0))
+
+        # GET untuk jawaban dari knowledge bisa di-cache klien/CDN: 304 jika versinya sama
+        if request.method == 'GET' and cached:
+            etag = http_cache.answer_etag(ai_system._question_hash(question), cached.answered_at)
+            if http_cache.is_not_modified(etag):
+                return http_cache.not_modified('ask', etag)
+
+        timeout = deadline.remaining(0)
+        if lane == LANE_CACHE:
+            result = cached
+        elif lane == LANE_MATH:
+            result = scheduler.run(LANE_MATH, profiling.bind(ai_system.answer_math_only, 'lane_math'),
+                                   question, deadline=deadline, tenant=tenant, timeout=timeout)
+        else:
+            result = scheduler.run(LANE_LLM, profiling.bind(ai_system.process_question, 'lane_llm'),
+                                   question, deadline=deadline, tenant=tenant, timeout=timeout)
+        
+        logger.info(f"🚦 Lane '{lane}' served: {question[:50]}")
+        
+        if cassette:
+            cassette.record_event(KIND_REQUEST, {
+                "question": question,
+                "method": request.method,
+                "lane": lane,
+                "deadline_ms": deadline.budget_ms,
+                "partial": bool(result.partial)
+            }, deadline.elapsed_ms())
+        
+        session_id = request.headers.get('X-Session-Id')
+        if session_id and result.success:
+            knowledge_store.append_context(session_id, question, result.answer)
+        
+        with profiling.stage('encode'):
+            response = jsonify(result.to_dict(selected))
+        # Hanya jawaban yang tersimpan di knowledge yang boleh di-cache;
+        # jawaban parsial, fallback, dan error tidak punya versi yang bisa divalidasi ulang
+        if request.method == 'GET' and result.success and not result.partial and result.answered_at:
+            http_cache.apply_cache_headers(
+                response, 'ask', http_cache.answer_etag(ai_system._question_hash(question), result.answered_at))
+        else:
+            response.headers['Cache-Control'] = 'no-store'
+        return response
+    
+    except LaneFullError as e:
+        logger.warning(f"⚠️ {e}")
+        return jsonify({
+            "success": False,
+            "error": "Server sedang sibuk, silakan coba lagi sebentar"
+        }), 503
+    
+    except FutureTimeoutError:
+        logger.warning(f"⏱️ Deadline exceeded while queued in lane '{lane}': {question[:50]}")
+        return jsonify({
+            "success": False,
+            "error": "Server sedang sibuk, silakan coba lagi sebentar"
+        }), 503, {'Retry-After': '1', 'Cache-Control': 'no-store'}
     
     except Exception as e:
         logger.error(f"❌ Endpoint error: {e}")
@@ -410,7 +684,7 @@ def ask_question():
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    response = jsonify({
         "status": "healthy",
         "service": "Enhanced AI Assistant",
         "version": "4.0.4",
@@ -426,9 +700,84 @@ def health_check():
         "endpoints": {
             "ask": "/api/ask",
             "health": "/api/health",
+            "scheduler": "/api/scheduler",
             "test": "/api/test"
         }
     })
+    return http_cache.conditional(response, 'health')
+
+@app.route('/api/scheduler', methods=['GET'])
+def scheduler_stats():
+    """Kedalaman antrian dan waktu tunggu per lane"""
+    return jsonify({
+        "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "lanes": scheduler.stats(),
+        "knowledge_store": knowledge_store.stats(),
+        "upstream_cassette": cassette.stats() if cassette else None
+    })
+
+def is_admin_request():
+    """Cek header X-Admin-Token; endpoint admin nonaktif jika ADMIN_TOKEN kosong"""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+def admin_forbidden():
+    return jsonify({
+        "success": False,
+        "error": "Admin token tidak valid"
+    }), 403
+
+@app.route('/api/admin/knowledge', methods=['GET', 'POST'])
+def knowledge_maintenance():
+    """Statistik (GET) dan maintenance (POST) knowledge base"""
+    if not is_admin_request():
+        return admin_forbidden()
+    
+    if request.method == 'GET':
+        return jsonify({"success": True, "stats": knowledge_store.db_stats()})
+    
+    data = request.get_json() or {}
+    action = data.get('action')
+    try:
+        if action == 'evict':
+            result = knowledge_store.evict(max_rows=data.get('max_rows'), max_bytes=data.get('max_bytes'))
+            if data.get('context_days'):
+                result["context_deleted"] = knowledge_store.prune_context(data['context_days'])["deleted"]
+            if data.get('vacuum', True):
+                result.update(knowledge_store.incremental_vacuum())
+        elif action == 'vacuum':
+            result = knowledge_store.incremental_vacuum(pages=data.get('pages', 0))
+        else:
+            return jsonify({
+                "success": False,
+                "error": "action harus 'evict' atau 'vacuum'"
+            }), 400
+    except Exception as e:
+        logger.error(f"❌ Knowledge maintenance error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+    
+    logger.info(f"🧹 Knowledge maintenance '{action}': {result}")
+    return jsonify({"success": True, "action": action, "result": result, "stats": knowledge_store.db_stats()})
+
+@app.route('/api/admin/knowledge/export', methods=['GET'])
+def knowledge_export():
+    """Stream tabel knowledge sebagai JSONL"""
+    if not is_admin_request():
+        return admin_forbidden()
+    return Response(knowledge_store.iter_export(), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': 'attachment; filename=knowledge.jsonl'})
+
+@app.route('/api/admin/knowledge/import', methods=['POST'])
+def knowledge_import():
+    """Import JSONL dari request body, dibaca baris demi baris"""
+    if not is_admin_request():
+        return admin_forbidden()
+    try:
+        result = knowledge_store.import_jsonl(io.TextIOWrapper(request.stream, encoding='utf-8'))
+    except Exception as e:
+        logger.error(f"❌ Knowledge import error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+    return jsonify({"success": True, "result": result})
 
 @app.route('/api/test', methods=['GET'])
 def test_api():
@@ -499,6 +848,7 @@ def home():
             <ul>
                 <li><a href="/api/health">/api/health</a> - Status server & features</li>
                 <li><a href="/api/test">/api/test</a> - Test connection</li>
+                <li><a href="/api/scheduler">/api/scheduler</a> - Antrian & waktu tunggu per lane</li>
                 <li>/api/ask - Enhanced AI Question endpoint (POST/GET)</li>
             </ul>
             
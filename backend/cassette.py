@@ -0,0 +1,220 @@
+# cassette.py
+"""Rekam & putar ulang panggilan upstream (DuckDuckGo, fetch halaman, Gemini).
+
+UPSTREAM_MODE=record  -> semua panggilan upstream + latensinya ditulis ke cassette
+UPSTREAM_MODE=replay  -> panggilan dilayani dari cassette tanpa akses network
+UPSTREAM_MODE=off     -> normal (default)
+
+Cassette adalah file JSONL ter-gzip, satu interaksi per baris:
+    {"kind": "ddgs.text", "key": "<sha1 request>", "ms": 412.3, "result": [...]}
+    {"kind": "gemini", "key": "...", "ms": 2310.0, "error": "429 quota exceeded"}
+
+Saat record setiap proses (mis. worker gunicorn) menulis file sendiri,
+<cassette>.<pid>, supaya worker yang mati tanpa menutup file hanya
+kehilangan ekor rekamannya sendiri. Replay membaca <cassette> beserta
+semua file per proses tersebut; ekor gzip yang terpotong dilewati.
+
+REPLAY_TIMING=keep menunggu selama latensi aslinya, REPLAY_TIMING=drop
+menjawab secepat mungkin (untuk mengukur throughput CPU murni).
+"""
+import os
+import glob
+import json
+import gzip
+import zlib
+import time
+import atexit
+import hashlib
+import logging
+import threading
+from collections import defaultdict, deque
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_MODE = os.getenv('UPSTREAM_MODE', 'off').lower()
+UPSTREAM_CASSETTE = os.getenv('UPSTREAM_CASSETTE', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'cassettes', 'upstream.jsonl.gz'))
+REPLAY_TIMING = os.getenv('REPLAY_TIMING', 'keep').lower()
+
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+
+# Jenis event yang bukan panggilan upstream (pertanyaan yang masuk ke /api/ask)
+KIND_REQUEST = 'request'
+
+
+class CassetteMiss(Exception):
+    """Interaksi tidak ditemukan di cassette saat replay"""
+
+
+class ReplayedUpstreamError(Exception):
+    """Error upstream yang terekam, dilempar ulang saat replay"""
+
+
+def request_key(kind, request):
+    payload = json.dumps([kind, request], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class Cassette:
+    def __init__(self, path, mode, timing=REPLAY_TIMING):
+        self.path = path
+        self.mode = mode
+        self.keep_timing = timing != 'drop'
+        self._lock = threading.Lock()
+        self._interactions = defaultdict(deque)
+        self._file = None
+        self._file_pid = None
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+        if mode == MODE_REPLAY:
+            self._load()
+        elif mode == MODE_RECORD:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            atexit.register(self.close)
+
+    def _load(self):
+        count = 0
+        for record in iter_records(self.path):
+            if record['kind'] != KIND_REQUEST:
+                self._interactions[record['key']].append(record)
+                count += 1
+        logger.info(f"📼 Cassette loaded for replay: {count} interactions from {self.path}")
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str) + "\n"
+        with self._lock:
+            if self._file_pid != os.getpid():
+                # Dibuka saat penulisan pertama di proses ini: worker hasil fork tidak
+                # ikut menulis ke file milik proses induk
+                self._file = gzip.open(f"{self.path}.{os.getpid()}", 'at', encoding='utf-8')
+                self._file_pid = os.getpid()
+            self._file.write(line)
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None and self._file_pid == os.getpid():
+                self._file.close()
+            self._file = None
+            self._file_pid = None
+
+    def record_event(self, kind, data, elapsed_ms):
+        """Catat event non-upstream (mis. pertanyaan yang masuk) untuk replay_bench.py"""
+        if self.mode == MODE_RECORD:
+            self._write({"kind": kind, "ms": round(elapsed_ms, 1), "data": data})
+
+    def call(self, kind, request, fn):
+        """Jalankan fn (record), atau ambil hasilnya dari cassette (replay)"""
+        key = request_key(kind, request)
+        if self.mode == MODE_REPLAY:
+            return self._replay(kind, key)
+
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            self._write({"kind": kind, "key": key, "ms": round((time.perf_counter() - started) * 1000, 1),
+                         "error": f"{type(e).__name__}: {e}"})
+            raise
+        self._write({"kind": kind, "key": key, "ms": round((time.perf_counter() - started) * 1000, 1),
+                     "result": result})
+        return result
+
+    def _replay(self, kind, key):
+        with self._lock:
+            queue = self._interactions.get(key)
+            if not queue:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded '{kind}' interaction for key {key[:12]}")
+            # Interaksi berulang diputar berurutan; yang terakhir dipakai terus
+            record = queue.popleft() if len(queue) > 1 else queue[0]
+            self.hits += 1
+
+        if self.keep_timing:
+            time.sleep(record['ms'] / 1000.0)
+        if 'error' in record:
+            raise ReplayedUpstreamError(record['error'])
+        return record['result']
+
+    def stats(self):
+        return {"mode": self.mode, "path": self.path, "keep_timing": self.keep_timing,
+                "hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+
+def cassette_files(path):
+    """File milik cassette: path itu sendiri (jika ada) dan file per proses path.<pid>"""
+    files = [path] if os.path.isfile(path) else []
+    parts = [p for p in glob.glob(glob.escape(path) + '.*') if p.rsplit('.', 1)[1].isdigit()]
+    return files + sorted(parts)
+
+
+def iter_records(path):
+    """Semua record dari cassette_files(path).
+
+    File yang terpotong (proses mati sebelum gzip trailer ditulis) dibaca
+    sampai baris utuh terakhir; sisanya dilewati dengan peringatan.
+    """
+    for file_path in cassette_files(path):
+        try:
+            with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"⚠️ Cassette {file_path}: baris terpotong dilewati")
+        except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+            logger.warning(f"⚠️ Cassette {file_path} terpotong, sisa file dilewati: {e}")
+
+
+class SearchClientProxy:
+    """Pengganti DDGS dengan method text/news yang sama"""
+
+    def __init__(self, cassette, client=None):
+        self.cassette = cassette
+        self.client = client
+
+    def text(self, query, max_results=None):
+        return self.cassette.call('ddgs.text', {"query": query, "max_results": max_results},
+                                  lambda: list(self.client.text(query, max_results=max_results)))
+
+    def news(self, query, max_results=None):
+        return self.cassette.call('ddgs.news', {"query": query, "max_results": max_results},
+                                  lambda: list(self.client.news(query, max_results=max_results)))
+
+
+class _ReplayedResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class GeminiModelProxy:
+    """Pengganti GenerativeModel; hanya generate_content yang dipakai app.py"""
+
+    def __init__(self, cassette, model=None):
+        self.cassette = cassette
+        self.model = model
+
+    def generate_content(self, prompt, generation_config=None):
+        config = {name: getattr(generation_config, name, None)
+                  for name in ('temperature', 'max_output_tokens', 'top_p')}
+        text = self.cassette.call(
+            'gemini', {"prompt": prompt, "config": config},
+            lambda: self.model.generate_content(prompt, generation_config=generation_config).text)
+        return _ReplayedResponse(text)
+
+
+def create_cassette():
+    """Cassette sesuai UPSTREAM_MODE, atau None jika mode off"""
+    if UPSTREAM_MODE not in (MODE_RECORD, MODE_REPLAY):
+        return None
+    cassette = Cassette(UPSTREAM_CASSETTE, UPSTREAM_MODE)
+    logger.info(f"📼 Upstream {UPSTREAM_MODE} mode: {UPSTREAM_CASSETTE}"
+                + (f" (timing: {'keep' if cassette.keep_timing else 'drop'})" if UPSTREAM_MODE == MODE_REPLAY else ""))
+    return cassette
@@ -0,0 +1,39 @@
+# deadline.py
+import os
+import time
+
+DEFAULT_DEADLINE_MS = int(os.getenv('REQUEST_DEADLINE_MS', '8000'))
+MAX_DEADLINE_MS = int(os.getenv('REQUEST_DEADLINE_MAX_MS', '30000'))
+MIN_DEADLINE_MS = 200
+# Waktu yang disisakan untuk menyusun jawaban parsial (fallback/extractive)
+DEADLINE_RESERVE_MS = int(os.getenv('REQUEST_DEADLINE_RESERVE_MS', '150'))
+
+DEADLINE_HEADER = 'X-Request-Deadline-Ms'
+
+
+class Deadline:
+    """Batas waktu sebuah request, dihitung dari saat request diterima"""
+
+    def __init__(self, budget_ms):
+        self.budget_ms = budget_ms
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget_ms / 1000.0
+
+    @classmethod
+    def from_header(cls, value):
+        """Budget dari header (milidetik), dibatasi MIN..MAX; default jika kosong/tidak valid"""
+        try:
+            budget_ms = int(value) if value else DEFAULT_DEADLINE_MS
+        except ValueError:
+            budget_ms = DEFAULT_DEADLINE_MS
+        return cls(min(max(budget_ms, MIN_DEADLINE_MS), MAX_DEADLINE_MS))
+
+    def remaining(self, reserve_ms=DEADLINE_RESERVE_MS):
+        """Sisa waktu dalam detik (setelah dikurangi reserve), minimal 0"""
+        return max(0.0, self.expires_at - time.monotonic() - reserve_ms / 1000.0)
+
+    def expired(self, reserve_ms=DEADLINE_RESERVE_MS):
+        return self.remaining(reserve_ms) <= 0
+
+    def elapsed_ms(self):
+        return int((time.monotonic() - self.started_at) * 1000)
@@ -0,0 +1,131 @@
+# extractive.py
+"""Ringkasan ekstraktif lokal untuk mode fallback (tanpa Gemini).
+
+Kalimat dari snippet hasil pencarian (dan teks halaman jika ada) diberi skor
+TF-IDF terhadap pertanyaan, lalu beberapa kalimat terbaik disusun menjadi
+jawaban singkat dengan nomor sumber.
+"""
+import math
+import re
+from collections import Counter
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[\"\'(\[]?[A-Z0-9])')
+TOKEN = re.compile(r'[^\W_]+', re.UNICODE)
+TRAILING_ELLIPSIS = re.compile(r'\s*(?:\.\.\.|…)\s*$')
+
+STOPWORDS = frozenset("""
+    yang dan di ke dari ini itu dengan untuk pada adalah dalam tidak akan juga atau
+    karena oleh sebagai bisa ada saat lebih telah sudah para kami kita mereka anda
+    saya dia ia apa siapa bagaimana mengapa kapan dimana berapa jelaskan tentang
+    sebuah seperti agar hingga antara setelah sebelum bahwa serta namun masih jika
+    the a an and or of to in on for is are was were be been by with as at from that
+    this it its what who how why when where which about into than then there their
+""".split())
+
+MIN_SENTENCE_WORDS = 5
+MAX_SENTENCE_CHARS = 400
+REDUNDANCY_THRESHOLD = 0.6
+
+
+def tokenize(text):
+    return [t for t in TOKEN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def split_sentences(text):
+    text = ' '.join(text.split())
+    truncated = bool(TRAILING_ELLIPSIS.search(text))
+    parts = [part.strip() for part in SENTENCE_SPLIT.split(TRAILING_ELLIPSIS.sub('', text))]
+
+    # Snippet yang dipotong ("...") berakhir dengan kalimat tidak lengkap
+    if truncated and parts and parts[-1][-1:] not in '.!?':
+        if len(parts) > 1:
+            parts.pop()
+        else:
+            parts[-1] += '…'
+
+    return [
+        sentence for sentence in parts
+        if len(sentence.split()) >= MIN_SENTENCE_WORDS and len(sentence) <= MAX_SENTENCE_CHARS
+    ]
+
+
+def _tfidf_vectors(token_lists):
+    """Vektor TF-IDF sparse (dict term -> bobot) yang sudah dinormalisasi L2"""
+    df = Counter()
+    for tokens in token_lists:
+        df.update(set(tokens))
+    n = len(token_lists)
+    idf = {term: math.log((n + 1) / (count + 1)) + 1.0 for term, count in df.items()}
+
+    vectors = []
+    for tokens in token_lists:
+        tf = Counter(tokens)
+        vector = {term: (1.0 + math.log(count)) * idf[term] for term, count in tf.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        vectors.append({term: w / norm for term, w in vector.items()})
+    return vectors, idf
+
+
+def _cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(term, 0.0) for term, w in a.items())
+
+
+def _query_vector(query_tokens, idf):
+    tf = Counter(t for t in query_tokens if t in idf)
+    vector = {term: (1.0 + math.log(count)) * idf[term] for term, count in tf.items()}
+    norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+    return {term: w / norm for term, w in vector.items()}
+
+
+def summarize(query, documents, max_sentences=3):
+    """Pilih kalimat paling relevan dari documents.
+
+    documents: list of dict dengan key 'text' (dan opsional 'title', 'url').
+    Mengembalikan list of (sentence, document_index, score), urut menurut skor.
+    """
+    candidates = []
+    for doc_index, doc in enumerate(documents):
+        for position, sentence in enumerate(split_sentences(doc.get('text', ''))):
+            candidates.append((sentence, doc_index, position))
+    if not candidates:
+        return []
+
+    token_lists = [tokenize(sentence) for sentence, _, _ in candidates]
+    vectors, idf = _tfidf_vectors(token_lists)
+    query_vector = _query_vector(tokenize(query), idf)
+
+    scored = []
+    for (sentence, doc_index, position), vector in zip(candidates, vectors):
+        score = _cosine(query_vector, vector)
+        # Kalimat awal dokumen dan dokumen dengan peringkat pencarian tinggi sedikit diutamakan
+        score *= 1.0 + 0.1 / (1 + position) + 0.05 / (1 + doc_index)
+        if score > 0:
+            scored.append((score, sentence, doc_index, vector))
+    scored.sort(key=lambda item: item[0], reverse=True)
+
+    selected = []
+    for score, sentence, doc_index, vector in scored:
+        if any(_cosine(vector, chosen[3]) > REDUNDANCY_THRESHOLD for chosen in selected):
+            continue
+        selected.append((score, sentence, doc_index, vector))
+        if len(selected) >= max_sentences:
+            break
+    return [(sentence, doc_index, score) for score, sentence, doc_index, _ in selected]
+
+
+def key_terms(query, documents, limit=5):
+    """Istilah paling penting di documents (urutan deterministik), selain kata di pertanyaan"""
+    query_terms = set(tokenize(query))
+    token_lists = [tokenize(doc.get('title', '') + ' ' + doc.get('text', '')) for doc in documents]
+    if not token_lists:
+        return []
+    vectors, _ = _tfidf_vectors(token_lists)
+    weights = Counter()
+    for vector in vectors:
+        for term, weight in vector.items():
+            if term not in query_terms and len(term) > 3 and not term.isdigit():
+                weights[term] += weight
+    return [term for term, _ in sorted(weights.items(), key=lambda item: (-item[1], item[0]))[:limit]]
+
@@ -0,0 +1,103 @@
+# http_cache.py
+"""Header cache HTTP (ETag, Cache-Control, 304) dan kompresi respons.
+
+Policy Cache-Control per route bisa diubah lewat .env:
+    CACHE_CONTROL_ASK, CACHE_CONTROL_HEALTH
+"""
+import os
+import gzip
+import hashlib
+import logging
+
+from flask import request, current_app
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    # brotli opsional, tanpa brotli hanya gzip yang dipakai
+    brotli = None
+
+# Dinaikkan setiap kali pipeline jawaban berubah, supaya ETag lama tidak dipakai lagi
+ANSWER_VERSION = os.getenv('ANSWER_VERSION', '4.0.4')
+
+CACHE_POLICIES = {
+    'ask': os.getenv('CACHE_CONTROL_ASK', 'public, max-age=300, stale-while-revalidate=3600'),
+    'health': os.getenv('CACHE_CONTROL_HEALTH', 'public, max-age=5, stale-while-revalidate=30'),
+}
+
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/html', 'text/plain')
+
+
+def answer_etag(question_hash, answered_at):
+    """ETag dari pertanyaan yang sudah dinormalisasi + versi baris knowledge (created_at)"""
+    return hashlib.sha1(f"{question_hash}|{answered_at}|{ANSWER_VERSION}".encode('utf-8')).hexdigest()[:32]
+
+
+def is_not_modified(etag):
+    """True jika request GET membawa If-None-Match yang cocok dengan etag"""
+    return request.method in ('GET', 'HEAD') and request.if_none_match.contains_weak(etag)
+
+
+def not_modified(route, etag):
+    """Respons 304 tanpa body, dengan validator dan policy yang sama"""
+    response = current_app.response_class(status=304)
+    apply_cache_headers(response, route, etag)
+    return response
+
+
+def apply_cache_headers(response, route, etag=None):
+    # Weak ETag: body bisa dikompresi berbeda (gzip/br) tapi isinya sama
+    if etag:
+        response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = CACHE_POLICIES[route]
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def conditional(response, route):
+    """ETag dari isi body lalu 304 jika klien sudah punya versi yang sama"""
+    etag = hashlib.sha1(response.get_data()).hexdigest()[:32]
+    apply_cache_headers(response, route, etag)
+    return response.make_conditional(request)
+
+
+def _choose_encoding():
+    offered = ['br', 'gzip'] if brotli else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+
+def compress_response(response):
+    """after_request: kompres body besar dengan br/gzip sesuai Accept-Encoding"""
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    if not encoding:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=min(COMPRESS_LEVEL, 11))
+    else:
+        compressed = gzip.compress(data, compresslevel=COMPRESS_LEVEL)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(compressed))
+    return response
+
+
+def init_app(app):
+    app.after_request(compress_response)
@@ -0,0 +1,65 @@
+# json_codec.py
+"""Encoder JSON cepat untuk respons API.
+
+Memakai orjson jika terpasang (dataclass seperti SearchResult di-serialize
+langsung tanpa dibangun ulang menjadi dict), selain itu json bawaan dengan
+output ringkas. Keduanya tanpa sort_keys dan tanpa escape non-ASCII, jadi
+jawaban berbahasa Indonesia + emoji tidak membengkak menjadi \\uXXXX.
+"""
+import json
+import logging
+
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    # orjson opsional, tanpa orjson dipakai json bawaan
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj, default=DefaultJSONProvider.default):
+    """Serialize obj menjadi bytes UTF-8 (ringkas, urutan key dipertahankan)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    """Parse JSON dari str atau bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_text(obj):
+    """Seperti dumps tapi str, untuk disimpan di kolom TEXT (mis. sources)"""
+    return dumps(obj).decode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider Flask: jsonify() memakai dumps() di atas"""
+
+    ensure_ascii = False
+    sort_keys = False
+    # Selalu ringkas, termasuk saat FLASK_DEBUG (jawaban Markdown bisa beberapa KB)
+    compact = True
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, self.default).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, self.default), mimetype=self.mimetype)
+
+
+def init_app(app):
+    app.json = FastJSONProvider(app)
+    logger.info(f"⚡ JSON encoder: {'orjson' if orjson else 'json (stdlib)'}")
@@ -0,0 +1,104 @@
+# kb_admin.py
+"""Maintenance knowledge_base.db: statistik, eviction, vacuum, export/import JSONL.
+
+Contoh:
+    python kb_admin.py stats
+    python kb_admin.py evict --max-rows 50000 --max-bytes 200000000
+    python kb_admin.py vacuum
+    python kb_admin.py export knowledge.jsonl      # atau '-' untuk stdout
+    python kb_admin.py import knowledge.jsonl      # atau '-' untuk stdin
+"""
+import os
+import sys
+import json
+import argparse
+from dotenv import load_dotenv
+
+from storage import KnowledgeStore
+
+load_dotenv()
+
+DEFAULT_DB = os.getenv('KNOWLEDGE_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge_base.db'))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Maintenance knowledge_base.db")
+    parser.add_argument('--db', default=DEFAULT_DB, help="Path database (default: KNOWLEDGE_DB atau knowledge_base.db)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('stats', help="Tampilkan jumlah baris dan ukuran database")
+
+    evict = sub.add_parser('evict', help="Hapus entri bernilai rendah sampai di bawah budget")
+    evict.add_argument('--max-rows', type=int, default=int(os.getenv('KB_MAX_ROWS', '0')))
+    evict.add_argument('--max-bytes', type=int, default=int(os.getenv('KB_MAX_BYTES', '0')))
+    evict.add_argument('--context-days', type=int, default=int(os.getenv('KB_CONTEXT_MAX_AGE_DAYS', '0')),
+                       help="Hapus juga conversation_context yang lebih tua dari N hari")
+    evict.add_argument('--no-vacuum', action='store_true', help="Jangan jalankan incremental vacuum setelahnya")
+
+    vacuum = sub.add_parser('vacuum', help="Incremental vacuum (konversi sekali untuk database lama)")
+    vacuum.add_argument('--pages', type=int, default=0, help="Jumlah halaman yang dibebaskan, 0 = semua")
+
+    export = sub.add_parser('export', help="Export tabel knowledge ke JSONL")
+    export.add_argument('output', help="File output atau '-' untuk stdout")
+
+    imp = sub.add_parser('import', help="Import JSONL hasil export")
+    imp.add_argument('input', help="File input atau '-' untuk stdin")
+    imp.add_argument('--batch-size', type=int, default=500)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command != 'import' and not os.path.exists(args.db):
+        print(f"❌ Database {args.db} tidak ditemukan!", file=sys.stderr)
+        return 1
+
+    store = KnowledgeStore(args.db)
+    # Pesan status ke stderr supaya 'export -' tetap menghasilkan JSONL bersih
+    log = sys.stderr
+
+    try:
+        if args.command == 'stats':
+            print(json.dumps(store.db_stats(), indent=2))
+
+        elif args.command == 'evict':
+            if not (args.max_rows or args.max_bytes or args.context_days):
+                print("⚠️ Tidak ada budget (--max-rows/--max-bytes/--context-days atau KB_MAX_ROWS/KB_MAX_BYTES)", file=log)
+                return 1
+            result = store.evict(max_rows=args.max_rows, max_bytes=args.max_bytes)
+            print(f"🧹 Evicted {result['deleted']} knowledge entries", file=log)
+            if args.context_days:
+                pruned = store.prune_context(args.context_days)
+                print(f"🧹 Pruned {pruned['deleted']} conversation_context rows", file=log)
+            if not args.no_vacuum:
+                vacuum = store.incremental_vacuum()
+                print(f"💾 Freed {vacuum['freed_bytes']} bytes (file: {vacuum['file_bytes']} bytes)", file=log)
+
+        elif args.command == 'vacuum':
+            vacuum = store.incremental_vacuum(pages=args.pages)
+            print(f"💾 Freed {vacuum['freed_bytes']} bytes (file: {vacuum['file_bytes']} bytes)", file=log)
+
+        elif args.command == 'export':
+            if args.output == '-':
+                count = store.export_jsonl(sys.stdout)
+            else:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    count = store.export_jsonl(f)
+            print(f"📤 Exported {count} entries", file=log)
+
+        elif args.command == 'import':
+            if args.input == '-':
+                result = store.import_jsonl(sys.stdin, batch_size=args.batch_size)
+            else:
+                with open(args.input, 'r', encoding='utf-8') as f:
+                    result = store.import_jsonl(f, batch_size=args.batch_size)
+            print(f"📥 Imported {result['imported']} entries ({result['skipped']} invalid lines skipped)", file=log)
+    finally:
+        store.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
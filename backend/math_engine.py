@@ -0,0 +1,532 @@
+# math_engine.py
+"""Mesin intent matematika berbasis tabel aturan.
+
+Input di-tokenisasi satu kali; setiap token dicari di indeks trigger
+(dict token -> aturan), sehingga menambah aturan tidak menambah biaya scan.
+Hanya aturan yang trigger-nya muncul yang dijalankan, urut menurut prioritas.
+"""
+import ast
+import math
+import operator
+import re
+import logging
+from collections import deque
+
+from sympy import symbols, solve, diff, integrate, Poly, sqrt as sym_sqrt
+from sympy.parsing.sympy_parser import (
+    parse_expr, standard_transformations, implicit_multiplication_application, convert_xor
+)
+
+logger = logging.getLogger(__name__)
+
+X = symbols('x')
+SYMPY_TRANSFORMS = standard_transformations + (implicit_multiplication_application, convert_xor)
+
+NUMBER = r'(-?\d+(?:[.,]\d+)?)'
+DECIMAL_COMMA = re.compile(r'(?<=\d),(?=\d)')
+TOKEN = re.compile(r'[a-z]+(?:-[a-z]+)*|[+\-*/^×÷=∫]|\d+(?:[.,]\d+)?')
+
+
+def _to_float(text):
+    return float(text.replace(',', '.'))
+
+
+def _fmt(value):
+    """Format angka: bilangan bulat tanpa desimal, lainnya maksimal 6 digit signifikan"""
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    if isinstance(value, float):
+        return f"{value:.6g}" if abs(value) >= 1e-4 else f"{value:.4e}"
+    return str(value)
+
+
+class MathQuery:
+    """Satu pertanyaan yang sudah di-tokenisasi; parameter diparse sekali saat dibutuhkan"""
+
+    def __init__(self, text):
+        self.text = text
+        # Koma desimal ("3,5") diseragamkan menjadi titik untuk semua aturan
+        self.lower = DECIMAL_COMMA.sub('.', text.lower().replace('×', '*').replace('÷', '/'))
+        self.tokens = TOKEN.findall(self.lower)
+        self.token_set = frozenset(self.tokens)
+        self._params = None
+
+    @property
+    def params(self):
+        if self._params is None:
+            self._params = {}
+            for match in PARAM_PATTERN.finditer(self.lower):
+                name = PARAM_ALIASES[match.group(1)]
+                self._params.setdefault(name, _to_float(match.group(2)))
+        return self._params
+
+
+# ---------------------------------------------------------------- aritmatika
+
+_BIN_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.Pow: operator.pow, ast.Mod: operator.mod,
+}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+# Pertanyaan yang seluruhnya aritmatika (mis. "hitung 25 × 4 + 100 ÷ 2")
+ARITHMETIC_ONLY_FILLER = re.compile(r'\b(?:hitung(?:lah)?|berapa(?:kah)?|hasil(?:nya)?|dari|adalah|kalkulasi)\b|[?=:]', re.IGNORECASE)
+ARITHMETIC_ONLY_CHARS = re.compile(r'^[\d\s+\-*/().,^×÷]+$')
+ARITHMETIC_EXPR = re.compile(r'[\d(][\d\s+\-*/().^]*[\d)]')
+ARITHMETIC_OPERATOR = re.compile(r'[\d)]\s*[+\-*/^]\s*[\d(]')
+# Batas ukuran bilangan bulat (bit); bigint yang lebih besar menahan GIL terlalu lama
+MAX_INT_BITS = 4096
+
+
+def _bounded(value):
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise ValueError("Angka terlalu besar")
+    return value
+
+
+def safe_eval(expression):
+    """Evaluasi ekspresi aritmatika tanpa eval(), dengan batas pangkat dan ukuran angka"""
+    def visit(node):
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return _bounded(node.value)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+            left, right = visit(node.left), visit(node.right)
+            if isinstance(node.op, ast.Pow):
+                if abs(right) > 1000:
+                    raise ValueError("Pangkat terlalu besar")
+                # Perkirakan ukuran hasil sebelum menghitung, bukan sesudahnya
+                if (isinstance(left, int) and isinstance(right, int) and right > 0
+                        and (abs(left).bit_length() - 1) * right > MAX_INT_BITS):
+                    raise ValueError("Angka terlalu besar")
+            return _bounded(_BIN_OPS[type(node.op)](left, right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+            return _UNARY_OPS[type(node.op)](visit(node.operand))
+        raise ValueError("Ekspresi tidak didukung")
+    return visit(ast.parse(expression.replace('^', '**'), mode='eval'))
+
+
+def is_arithmetic_only(text):
+    """True jika pertanyaan hanya berisi ekspresi aritmatika (plus kata seperti "hitung")"""
+    expression = ARITHMETIC_ONLY_FILLER.sub(' ', text).strip()
+    return bool(expression and ARITHMETIC_ONLY_CHARS.match(expression)
+                and ARITHMETIC_OPERATOR.search(expression.replace('×', '*').replace('÷', '/')))
+
+
+def rule_arithmetic(query):
+    candidates = [m.group(0).strip() for m in ARITHMETIC_EXPR.finditer(query.lower)]
+    candidates = [c for c in candidates if ARITHMETIC_OPERATOR.search(c)]
+    if not candidates:
+        return None
+    expression = ' '.join(max(candidates, key=len).split())
+    result = safe_eval(expression)
+    return f"**Jawaban Matematika:**\n\n`{expression}` = `{_fmt(result)}`"
+
+
+# ---------------------------------------------------------------- persamaan
+
+EQUATION = re.compile(r'([0-9x+\-*/^().\s]*x[0-9x+\-*/^().\s]*=[0-9x+\-*/^().\s]+|[0-9x+\-*/^().\s]+=[0-9x+\-*/^().\s]*x[0-9x+\-*/^().\s]*)')
+# Batas persamaan polinomial: Poly/solve untuk derajat besar bisa berjalan sangat lama
+MAX_DEGREE = 10
+MAX_POWERS = 4
+EXPONENT = re.compile(r'\^\s*(\d+)(?!\s*[\d.^])')
+
+
+def _degree(expr):
+    """Derajat polinomial dalam x tanpa ekspansi; ValueError jika bukan polinomial"""
+    if expr == X:
+        return 1
+    if expr.is_number:
+        return 0
+    if expr.is_Add:
+        return max(_degree(arg) for arg in expr.args)
+    if expr.is_Mul:
+        return sum(_degree(arg) for arg in expr.args)
+    if expr.is_Pow and expr.exp.is_Integer and expr.exp >= 0:
+        return _degree(expr.base) * int(expr.exp)
+    raise ValueError("Bukan polinomial dalam x")
+
+
+def rule_equation(query):
+    match = EQUATION.search(query.lower)
+    if not match:
+        return None
+    text = match.group(1).replace('**', '^')
+    exponents = EXPONENT.findall(text)
+    if (text.count('^') > MAX_POWERS or len(exponents) != text.count('^')
+            or any(int(e) > MAX_DEGREE for e in exponents)):
+        return None
+    left, right = (part.strip() for part in text.split('=', 1))
+    if not left or not right:
+        return None
+    expr = parse_expr(left, transformations=SYMPY_TRANSFORMS) - parse_expr(right, transformations=SYMPY_TRANSFORMS)
+    if _degree(expr) > MAX_DEGREE:
+        return None
+    poly = Poly(expr, X)
+    degree = poly.degree()
+    equation = f"{left} = {right}"
+
+    if degree == 1:
+        a, b = poly.all_coeffs()
+        solution = -b / a
+        return (f"**Persamaan Linear:**\n\n`{equation}`\n\n"
+                f"- Bentuk umum: {a}x + ({b}) = 0\n"
+                f"- x = -({b}) / {a}\n\n**x = {solution}**")
+
+    if degree == 2:
+        a, b, c = poly.all_coeffs()
+        discriminant = b ** 2 - 4 * a * c
+        roots = [(-b + sym_sqrt(discriminant)) / (2 * a), (-b - sym_sqrt(discriminant)) / (2 * a)]
+        roots = list(dict.fromkeys(r.simplify() for r in roots))
+        if discriminant > 0:
+            kind = "dua akar real berbeda"
+        elif discriminant == 0:
+            kind = "akar kembar"
+        else:
+            kind = "akar kompleks"
+        return (f"**Persamaan Kuadrat:**\n\n`{equation}`\n\n"
+                f"- a = {a}, b = {b}, c = {c}\n"
+                f"- Diskriminan D = b² - 4ac = {discriminant} ({kind})\n"
+                f"- x = (-b ± √D) / 2a\n\n"
+                f"**x = {', '.join(str(r) for r in roots)}**")
+
+    solutions = solve(expr, X)
+    if solutions:
+        return f"**Solusi Persamaan:**\n\n`{equation}`\n\n**x = {solutions}**"
+    return None
+
+
+# ------------------------------------------------------------------ kalkulus
+
+DERIVATIVE_FUNC = re.compile(r'[fd]\(x\)\s*=\s*([^,\n]+)')
+INTEGRAL_FUNC = re.compile(r'∫\s*(.+?)\s*dx')
+
+# parse_expr memakai eval(), jadi teks dari pengguna dibatasi ke karakter dan nama fungsi matematika
+FUNCTION_CHARS = re.compile(r'^[0-9a-z+\-*/^().\s]+$')
+FUNCTION_NAMES = frozenset({
+    'x', 'e', 'pi', 'sqrt', 'exp', 'log', 'ln', 'abs',
+    'sin', 'cos', 'tan', 'cot', 'sec', 'csc', 'asin', 'acos', 'atan', 'sinh', 'cosh', 'tanh',
+})
+
+
+def parse_function(text):
+    """parse_expr untuk f(x) dari pengguna; ValueError jika ada karakter/nama di luar whitelist"""
+    text = text.lower()
+    if (not FUNCTION_CHARS.match(text)
+            or re.search(r'\.(?!\d)', text)
+            or not set(re.findall(r'[a-z]+', text)) <= FUNCTION_NAMES):
+        raise ValueError(f"Fungsi tidak didukung: {text}")
+    return parse_expr(text, transformations=SYMPY_TRANSFORMS)
+
+
+def rule_derivative(query):
+    match = DERIVATIVE_FUNC.search(query.text)
+    if not match:
+        return None
+    func_str = match.group(1).strip()
+    derivative = diff(parse_function(func_str), X)
+    return f"**Turunan:**\n\nf(x) = {func_str}\n\nf'(x) = {derivative}"
+
+
+def rule_integral(query):
+    match = INTEGRAL_FUNC.search(query.text)
+    if not match:
+        return None
+    func_str = match.group(1).strip()
+    integral = integrate(parse_function(func_str), X)
+    return f"**Integral:**\n\n∫ {func_str} dx = {integral} + C"
+
+
+# ------------------------------------------------------------------- geometri
+
+PARAM_ALIASES = {
+    'jari-jari': 'r', 'jari jari': 'r', 'jari': 'r', 'radius': 'r', 'r': 'r',
+    'diameter': 'd', 'd': 'd',
+    'sisi': 's', 's': 's', 'rusuk': 's',
+    'panjang': 'p', 'p': 'p',
+    'lebar': 'l', 'l': 'l',
+    'tinggi': 't', 't': 't',
+    'alas': 'alas',
+    'a': 'a', 'b': 'b', 'c': 'c',
+}
+PARAM_PATTERN = re.compile(
+    r'\b(' + '|'.join(sorted((re.escape(k) for k in PARAM_ALIASES), key=len, reverse=True)) + r')'
+    r'\s*(?:=|:|adalah)?\s*' + NUMBER
+)
+
+# shape -> list of (besaran, parameter wajib, rumus teks, fungsi)
+SHAPES = {
+    'lingkaran': [
+        ('Luas', ('r',), 'π × r²', lambda p: math.pi * p['r'] ** 2),
+        ('Keliling', ('r',), '2 × π × r', lambda p: 2 * math.pi * p['r']),
+    ],
+    'persegi': [
+        ('Luas', ('s',), 's²', lambda p: p['s'] ** 2),
+        ('Keliling', ('s',), '4 × s', lambda p: 4 * p['s']),
+    ],
+    'persegi panjang': [
+        ('Luas', ('p', 'l'), 'p × l', lambda p: p['p'] * p['l']),
+        ('Keliling', ('p', 'l'), '2 × (p + l)', lambda p: 2 * (p['p'] + p['l'])),
+    ],
+    'segitiga': [
+        ('Luas', ('alas', 't'), '½ × alas × t', lambda p: 0.5 * p['alas'] * p['t']),
+        ('Keliling', ('a', 'b', 'c'), 'a + b + c', lambda p: p['a'] + p['b'] + p['c']),
+        ('Luas (Heron)', ('a', 'b', 'c'), '√(s(s-a)(s-b)(s-c))', lambda p: _heron(p['a'], p['b'], p['c'])),
+    ],
+    'trapesium': [
+        ('Luas', ('a', 'b', 't'), '½ × (a + b) × t', lambda p: 0.5 * (p['a'] + p['b']) * p['t']),
+    ],
+    'jajar genjang': [
+        ('Luas', ('alas', 't'), 'alas × t', lambda p: p['alas'] * p['t']),
+    ],
+    'kubus': [
+        ('Volume', ('s',), 's³', lambda p: p['s'] ** 3),
+        ('Luas Permukaan', ('s',), '6 × s²', lambda p: 6 * p['s'] ** 2),
+    ],
+    'balok': [
+        ('Volume', ('p', 'l', 't'), 'p × l × t', lambda p: p['p'] * p['l'] * p['t']),
+        ('Luas Permukaan', ('p', 'l', 't'), '2 × (pl + pt + lt)',
+         lambda p: 2 * (p['p'] * p['l'] + p['p'] * p['t'] + p['l'] * p['t'])),
+    ],
+    'bola': [
+        ('Volume', ('r',), '⁴⁄₃ × π × r³', lambda p: 4 / 3 * math.pi * p['r'] ** 3),
+        ('Luas Permukaan', ('r',), '4 × π × r²', lambda p: 4 * math.pi * p['r'] ** 2),
+    ],
+    'tabung': [
+        ('Volume', ('r', 't'), 'π × r² × t', lambda p: math.pi * p['r'] ** 2 * p['t']),
+        ('Luas Permukaan', ('r', 't'), '2 × π × r × (r + t)', lambda p: 2 * math.pi * p['r'] * (p['r'] + p['t'])),
+    ],
+    'kerucut': [
+        ('Volume', ('r', 't'), '⅓ × π × r² × t', lambda p: math.pi * p['r'] ** 2 * p['t'] / 3),
+        ('Luas Permukaan', ('r', 't'), 'π × r × (r + √(r² + t²))',
+         lambda p: math.pi * p['r'] * (p['r'] + math.hypot(p['r'], p['t']))),
+    ],
+}
+
+# Token pertanyaan -> kata kunci besaran yang diminta
+QUANTITY_KEYWORDS = {
+    'luas': ('Luas',), 'keliling': ('Keliling',), 'volume': ('Volume',), 'isi': ('Volume',),
+    'permukaan': ('Luas Permukaan',),
+}
+# Token -> nama bangun (bentuk dua kata dicek lewat pasangan token)
+SHAPE_TOKENS = {
+    'lingkaran': 'lingkaran', 'persegi': 'persegi', 'segitiga': 'segitiga', 'trapesium': 'trapesium',
+    'jajargenjang': 'jajar genjang', 'jajar': 'jajar genjang', 'kubus': 'kubus', 'balok': 'balok',
+    'bola': 'bola', 'tabung': 'tabung', 'silinder': 'tabung', 'kerucut': 'kerucut',
+}
+
+
+def _heron(a, b, c):
+    s = (a + b + c) / 2
+    area = s * (s - a) * (s - b) * (s - c)
+    if area < 0:
+        raise ValueError("Sisi tidak membentuk segitiga")
+    return math.sqrt(area)
+
+
+def rule_geometry(query):
+    shape = None
+    for index, token in enumerate(query.tokens):
+        if token in SHAPE_TOKENS:
+            shape = SHAPE_TOKENS[token]
+            if shape == 'persegi' and query.tokens[index + 1:index + 2] == ['panjang']:
+                shape = 'persegi panjang'
+            break
+    if not shape:
+        return None
+
+    params = dict(query.params)
+    if 'r' not in params and 'd' in params:
+        params['r'] = params['d'] / 2
+    if shape == 'persegi' and 's' not in params and 'p' in params:
+        params['s'] = params['p']
+
+    wanted = set()
+    for token in query.tokens:
+        wanted.update(QUANTITY_KEYWORDS.get(token, ()))
+    if 'Luas Permukaan' in wanted:
+        wanted.discard('Luas')
+
+    lines = []
+    for name, required, formula, func in SHAPES[shape]:
+        if wanted and name.split(' (')[0] not in wanted:
+            continue
+        if all(key in params for key in required):
+            lines.append(f"- {name} = {formula} = {func(params):.2f}")
+    if not lines:
+        return None
+
+    used = sorted({key for _, required, _, _ in SHAPES[shape] for key in required if key in params})
+    label = ', '.join(f"{key}={_fmt(params[key])}" for key in used)
+    return f"**{shape.title()} ({label}):**\n\n" + "\n".join(lines)
+
+
+# ------------------------------------------------------------- konversi satuan
+
+# Graf konversi: (satuan, satuan lain, faktor) artinya 1 satuan = faktor × satuan lain
+CONVERSION_EDGES = [
+    # Panjang
+    ('km', 'hm', 10), ('hm', 'dam', 10), ('dam', 'm', 10), ('m', 'dm', 10), ('dm', 'cm', 10),
+    ('cm', 'mm', 10), ('inch', 'cm', 2.54), ('ft', 'inch', 12), ('yard', 'ft', 3), ('mile', 'yard', 1760),
+    # Massa
+    ('ton', 'kuintal', 10), ('kuintal', 'kg', 100), ('kg', 'hg', 10), ('hg', 'dag', 10), ('dag', 'g', 10),
+    ('g', 'mg', 1000), ('ons', 'g', 100), ('lb', 'g', 453.59237), ('oz', 'g', 28.349523125),
+    # Volume
+    ('m3', 'l', 1000), ('l', 'dl', 10), ('dl', 'cl', 10), ('cl', 'ml', 10), ('ml', 'cc', 1),
+    ('gallon', 'l', 3.785411784),
+    # Waktu
+    ('minggu', 'hari', 7), ('hari', 'jam', 24), ('jam', 'menit', 60), ('menit', 'detik', 60),
+    ('detik', 'ms', 1000), ('tahun', 'hari', 365),
+    # Data
+    ('tb', 'gb', 1024), ('gb', 'mb', 1024), ('mb', 'kb', 1024), ('kb', 'byte', 1024), ('byte', 'bit', 8),
+    # Kecepatan
+    ('m/s', 'km/jam', 3.6), ('knot', 'km/jam', 1.852), ('mph', 'km/jam', 1.609344),
+]
+
+UNIT_ALIASES = {
+    'kilometer': 'km', 'hektometer': 'hm', 'dekameter': 'dam', 'meter': 'm', 'desimeter': 'dm',
+    'sentimeter': 'cm', 'centimeter': 'cm', 'milimeter': 'mm', 'inci': 'inch', 'inchi': 'inch',
+    'kaki': 'ft', 'feet': 'ft', 'foot': 'ft', 'mil': 'mile', 'miles': 'mile',
+    'kilogram': 'kg', 'gram': 'g', 'miligram': 'mg', 'hektogram': 'hg', 'dekagram': 'dag',
+    'pon': 'lb', 'pound': 'lb', 'lbs': 'lb', 'ounce': 'oz',
+    'liter': 'l', 'mililiter': 'ml', 'desiliter': 'dl', 'sentiliter': 'cl', 'galon': 'gallon',
+    'kubik': 'm3', 'm³': 'm3',
+    'second': 'detik', 'sekon': 'detik', 's': 'detik', 'minute': 'menit', 'hour': 'jam',
+    'day': 'hari', 'week': 'minggu', 'year': 'tahun', 'milidetik': 'ms',
+    'kilobyte': 'kb', 'megabyte': 'mb', 'gigabyte': 'gb', 'terabyte': 'tb', 'bytes': 'byte',
+    'km/h': 'km/jam', 'kmh': 'km/jam', 'kph': 'km/jam', 'meter/detik': 'm/s', 'mps': 'm/s',
+    # Suhu (konversi affine, bukan faktor)
+    'c': 'celsius', '°c': 'celsius', 'f': 'fahrenheit', '°f': 'fahrenheit', 'k': 'kelvin',
+    'r': 'reamur', '°r': 'reamur', 'reaumur': 'reamur',
+}
+
+
+def _build_conversion_table(edges):
+    """Hitung faktor untuk setiap pasangan satuan yang terhubung di graf (sekali saat import)"""
+    graph = {}
+    for src, dst, factor in edges:
+        graph.setdefault(src, []).append((dst, factor))
+        graph.setdefault(dst, []).append((src, 1 / factor))
+
+    table = {}
+    for start in graph:
+        factors = {start: 1.0}
+        pending = deque([start])
+        while pending:
+            unit = pending.popleft()
+            for neighbour, factor in graph[unit]:
+                if neighbour not in factors:
+                    factors[neighbour] = factors[unit] * factor
+                    pending.append(neighbour)
+        for unit, factor in factors.items():
+            table[(start, unit)] = factor
+    return table
+
+
+CONVERSION_TABLE = _build_conversion_table(CONVERSION_EDGES)
+
+# Suhu: ke/dari Celsius
+TEMPERATURE = {
+    'celsius': (lambda v: v, lambda c: c),
+    'fahrenheit': (lambda v: (v - 32) * 5 / 9, lambda c: c * 9 / 5 + 32),
+    'kelvin': (lambda v: v - 273.15, lambda c: c + 273.15),
+    'reamur': (lambda v: v * 5 / 4, lambda c: c * 4 / 5),
+}
+
+ALL_UNITS = ({unit for pair in CONVERSION_TABLE for unit in pair}
+             | set(UNIT_ALIASES) | set(TEMPERATURE))
+UNIT_PATTERN = '|'.join(sorted((re.escape(u) for u in ALL_UNITS), key=len, reverse=True))
+CONVERSION = re.compile(
+    NUMBER + r'\s*(?:derajat\s*)?(' + UNIT_PATTERN + r')(?![\w/])\s*'
+    r'(?:=|ke|to|in|dalam|menjadi|jadi|sama dengan)\s*(?:berapa\s*)?(?:derajat\s*)?'
+    r'(' + UNIT_PATTERN + r')(?![\w/])'
+)
+
+
+def _canonical_unit(unit):
+    return UNIT_ALIASES.get(unit, unit)
+
+
+def convert_units(value, src, dst):
+    """Konversi nilai antar satuan; None jika satuan tidak satu dimensi"""
+    src, dst = _canonical_unit(src), _canonical_unit(dst)
+    if src in TEMPERATURE and dst in TEMPERATURE:
+        return TEMPERATURE[dst][1](TEMPERATURE[src][0](value))
+    factor = CONVERSION_TABLE.get((src, dst))
+    return value * factor if factor is not None else None
+
+
+def rule_conversion(query):
+    match = CONVERSION.search(query.lower)
+    if not match:
+        return None
+    value = _to_float(match.group(1))
+    src, dst = match.group(2), match.group(3)
+    result = convert_units(value, src, dst)
+    if result is None:
+        return None
+    src, dst = _canonical_unit(src), _canonical_unit(dst)
+    return f"**Konversi Satuan:**\n\n`{_fmt(value)} {src}` = `{_fmt(result)} {dst}`"
+
+
+# --------------------------------------------------------------- tabel aturan
+
+# Operator saja bukan intent ("skor 2-1", "buka 24/7"); aritmatika butuh kata kunci
+# atau pertanyaan yang seluruhnya ekspresi (lihat is_arithmetic_only)
+# "berapa" bukan trigger: "berapa skor 2-1" adalah pertanyaan biasa. "berapa 12/4" tetap
+# dijawab karena seluruh pertanyaannya ekspresi.
+ARITHMETIC_TRIGGERS = ('hitung', 'hitunglah', 'kalkulasi', 'kalkulator',
+                       'matematika', 'aritmatika', 'calculate', 'compute')
+
+# (nama, prioritas, token trigger, handler) - prioritas kecil dijalankan lebih dulu
+RULES = [
+    ('conversion', 10, ('konversi', 'konversikan', 'ubah', 'ubahlah', 'convert', 'ke', 'to', 'dalam', 'menjadi', '='),
+     rule_conversion),
+    ('derivative', 20, ('turunan', 'derivative', 'diferensial'), rule_derivative),
+    ('integral', 20, ('integral', '∫'), rule_integral),
+    ('geometry', 30, tuple(SHAPE_TOKENS) + tuple(QUANTITY_KEYWORDS), rule_geometry),
+    ('equation', 40, ('=', 'persamaan', 'solve', 'selesaikan', 'x'), rule_equation),
+    ('arithmetic', 50, ARITHMETIC_TRIGGERS, rule_arithmetic),
+]
+
+
+def _build_trigger_index(rules):
+    index = {}
+    for rule in rules:
+        for token in rule[2]:
+            index.setdefault(token, []).append(rule)
+    return index
+
+
+TRIGGER_INDEX = _build_trigger_index(RULES)
+ARITHMETIC_RULE = next(rule for rule in RULES if rule[0] == 'arithmetic')
+
+
+def candidate_rules(query):
+    """Aturan yang trigger-nya ada di pertanyaan, urut menurut prioritas"""
+    found = {}
+    for token in query.token_set:
+        for rule in TRIGGER_INDEX.get(token, ()):
+            found[rule[0]] = rule
+    if 'arithmetic' not in found and is_arithmetic_only(query.text):
+        found['arithmetic'] = ARITHMETIC_RULE
+    return sorted(found.values(), key=lambda rule: rule[1])
+
+
+def has_math_intent(text):
+    return bool(candidate_rules(MathQuery(text)))
+
+
+def solve_problem(text):
+    """Jalankan aturan yang relevan; kembalikan jawaban Markdown pertama yang berhasil"""
+    query = MathQuery(text)
+    for name, _, _, handler in candidate_rules(query):
+        try:
+            answer = handler(query)
+        except Exception as e:
+            # Aturan lain mungkin masih bisa menjawab
+            logger.debug(f"Math rule '{name}' failed: {e}")
+            continue
+        if answer:
+            return answer
+    return None
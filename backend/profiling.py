@@ -0,0 +1,215 @@
+# profiling.py
+"""Profiling per request (opt-in) dengan output collapsed-stack untuk flamegraph.
+
+Aktif jika request membawa header X-Profile: 1 (dengan admin token) atau
+lewat sampling 1 dari PROFILE_SAMPLE_EVERY request. Sebuah thread sampler
+mengambil stack thread-thread yang sedang mengerjakan request tersebut,
+dikelompokkan per stage pipeline (search, llm, math, ...).
+
+Hasil per request di PROFILE_DIR:
+    <id>.wall.folded   - sampel wall-clock (termasuk menunggu network)
+    <id>.cpu.folded    - waktu CPU per stack (mikrodetik)
+    <id>.json          - ringkasan wall/CPU per stage
+
+Lihat dengan: flamegraph.pl <id>.wall.folded > out.svg, atau buka di speedscope.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager, nullcontext
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+PROFILE_SAMPLE_EVERY = int(os.getenv('PROFILE_SAMPLE_EVERY', '0'))   # 0 = sampling mati
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '50'))       # jumlah profil yang disimpan
+PROFILE_HEADER = 'X-Profile'
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_request_counter = itertools.count(1)
+_NULL_STAGE = nullcontext()
+
+
+def _thread_cpu_clock(ident):
+    """Clock CPU untuk thread lain (Linux); None jika tidak didukung"""
+    try:
+        return time.pthread_getcpuclockid(ident)
+    except (AttributeError, OSError):
+        return None
+
+
+class RequestProfile:
+    def __init__(self, label, interval_ms=PROFILE_INTERVAL_MS):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.label = label
+        self.interval = interval_ms / 1000.0
+        self.started = time.perf_counter()
+
+        self._lock = threading.Lock()
+        self._stages = {}                     # thread ident -> list of stage names
+        self._cpu_clocks = {}                 # thread ident -> (clock id, last cpu time)
+        self._wall = Counter()
+        self._cpu = Counter()
+        self._stage_wall = defaultdict(float)
+        self._stage_cpu = defaultdict(float)
+        self._stage_calls = Counter()
+        self._samples = 0
+
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name=f"profiler-{self.id}", daemon=True)
+        self._sampler.start()
+
+    @contextmanager
+    def stage(self, name):
+        ident = threading.get_ident()
+        with self._lock:
+            stack = self._stages.setdefault(ident, [])
+            stack.append(name)
+            if ident not in self._cpu_clocks:
+                clock = _thread_cpu_clock(ident)
+                if clock is not None:
+                    self._cpu_clocks[ident] = (clock, time.clock_gettime(clock))
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            with self._lock:
+                self._stage_wall[name] += wall
+                self._stage_cpu[name] += cpu
+                self._stage_calls[name] += 1
+                stack.pop()
+                if not stack:
+                    del self._stages[ident]
+                    self._cpu_clocks.pop(ident, None)
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, stack in self._stages.items():
+                    frame = frames.get(ident)
+                    if frame is None or ident == own:
+                        continue
+                    key = stack[-1] + ';' + _collapse(frame)
+                    self._wall[key] += 1
+                    clock = self._cpu_clocks.get(ident)
+                    if clock:
+                        try:
+                            now = time.clock_gettime(clock[0])
+                        except OSError:
+                            continue
+                        delta_us = int((now - clock[1]) * 1_000_000)
+                        self._cpu_clocks[ident] = (clock[0], now)
+                        if delta_us > 0:
+                            self._cpu[key] += delta_us
+                self._samples += 1
+
+    def finish(self, directory=PROFILE_DIR):
+        self._stop.set()
+        self._sampler.join(timeout=1)
+        total = time.perf_counter() - self.started
+        try:
+            os.makedirs(directory, exist_ok=True)
+            base = os.path.join(directory, self.id)
+            _write_folded(base + '.wall.folded', self._wall)
+            _write_folded(base + '.cpu.folded', self._cpu)
+            with open(base + '.json', 'w', encoding='utf-8') as f:
+                json.dump({
+                    "id": self.id,
+                    "label": self.label,
+                    "total_ms": round(total * 1000, 3),
+                    "interval_ms": self.interval * 1000,
+                    "samples": self._samples,
+                    "stages": {
+                        name: {
+                            "calls": self._stage_calls[name],
+                            "wall_ms": round(self._stage_wall[name] * 1000, 3),
+                            "cpu_ms": round(self._stage_cpu[name] * 1000, 3),
+                        }
+                        for name in self._stage_calls
+                    },
+                }, f, indent=2, ensure_ascii=False)
+            _rotate(directory, PROFILE_MAX_FILES)
+            logger.info(f"🔬 Profile saved: {base}.* ({total * 1000:.0f} ms, {self._samples} samples)")
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to write profile {self.id}: {e}")
+
+
+def _collapse(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    names.reverse()
+    return ';'.join(names)
+
+
+def _write_folded(path, counter):
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in counter.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def _rotate(directory, keep):
+    """Simpan hanya `keep` profil terbaru (satu profil = beberapa file dengan id sama)"""
+    ids = sorted({name.split('.', 1)[0] for name in os.listdir(directory)})
+    for old_id in ids[:-keep] if keep > 0 else []:
+        for suffix in ('.wall.folded', '.cpu.folded', '.json'):
+            try:
+                os.remove(os.path.join(directory, old_id + suffix))
+            except FileNotFoundError:
+                pass
+
+
+# ------------------------------------------------------------------ API publik
+
+def start(label, forced=False):
+    """Mulai profil untuk request ini jika diminta atau terpilih sampling; None jika tidak"""
+    if not forced and not (PROFILE_SAMPLE_EVERY and next(_request_counter) % PROFILE_SAMPLE_EVERY == 0):
+        return None
+    profile = RequestProfile(label)
+    profile._token = _current.set(profile)
+    profile._root = profile.stage('request')
+    profile._root.__enter__()
+    return profile
+
+
+def finish(profile):
+    profile._root.__exit__(None, None, None)
+    _current.reset(profile._token)
+    profile.finish()
+
+
+def stage(name):
+    """Context manager penanda stage pipeline; hampir tanpa biaya jika profiling mati"""
+    profile = _current.get()
+    if profile is None:
+        return _NULL_STAGE
+    return profile.stage(name)
+
+
+def bind(fn, stage_name=None):
+    """Bungkus fn agar profil aktif ikut ke thread lain (scheduler/upstream pool)"""
+    profile = _current.get()
+    if profile is None:
+        return fn
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        if stage_name:
+            with profile.stage(stage_name):
+                return context.run(fn, *args, **kwargs)
+        with profile.stage('worker'):
+            return context.run(fn, *args, **kwargs)
+    return run
@@ -0,0 +1,73 @@
+# records.py
+"""Representasi ringkas hasil pencarian dan respons /api/ask.
+
+Dataclass dengan __slots__: lebih hemat memori daripada dict per hasil dan
+di-serialize langsung oleh orjson (lihat json_codec.py).
+"""
+from dataclasses import dataclass, field, fields
+from typing import List, Optional
+
+
+@dataclass(slots=True)
+class SearchResult:
+    type: str
+    title: str
+    url: str
+    snippet: str
+    relevance: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data):
+        """Dari dict yang tersimpan di kolom sources knowledge base"""
+        return cls(
+            type=data.get("type", "web"),
+            title=data.get("title", "No Title"),
+            url=data.get("url", "#"),
+            snippet=data.get("snippet", ""),
+            relevance=data.get("relevance", 0.0)
+        )
+
+
+@dataclass(slots=True)
+class AskResponse:
+    success: bool
+    question: str
+    answer: str
+    search_results: List[SearchResult] = field(default_factory=list)
+    sources_count: Optional[int] = None
+    math_solved: Optional[bool] = None
+    ai_available: Optional[bool] = None
+    search_available: Optional[bool] = None
+    enhanced_features: Optional[bool] = None
+    partial: Optional[bool] = None
+    gemini_answered: Optional[bool] = None
+    cached: Optional[bool] = None
+    answered_at: Optional[str] = None       # created_at baris knowledge (versi jawaban)
+    elapsed_ms: Optional[int] = None
+    error: Optional[str] = None
+
+    def to_dict(self, selected=None):
+        """Field yang bernilai None tidak dikirim; selected membatasi field (lihat parse_fields)"""
+        names = selected or FIELD_NAMES
+        return {name: value for name in names if (value := getattr(self, name)) is not None}
+
+
+FIELD_NAMES = tuple(f.name for f in fields(AskResponse))
+# Selalu dikirim supaya klien tetap bisa membedakan sukses dan gagal
+REQUIRED_FIELDS = ('success', 'error')
+
+
+def parse_fields(value):
+    """Selector fields= ("answer,sources_count" atau list) menjadi tuple nama field.
+
+    None jika tidak ada selector (semua field); nama yang tidak dikenal diabaikan.
+    ValueError jika bukan string atau list berisi string.
+    """
+    if value is None or value == '' or value == []:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+        raise ValueError("fields harus berupa string dipisah koma atau list nama field")
+    requested = {name.strip() for name in value}
+    return tuple(name for name in FIELD_NAMES if name in requested or name in REQUIRED_FIELDS)
@@ -0,0 +1,111 @@
+# replay_bench.py
+"""Putar ulang traffic yang direkam (UPSTREAM_MODE=record) terhadap build saat ini.
+
+Semua panggilan DuckDuckGo/Gemini/fetch dilayani dari cassette, jadi tidak
+butuh network. Hasilnya throughput dan latensi dibandingkan dengan rekaman.
+
+Contoh:
+    python replay_bench.py cassettes/upstream.jsonl.gz --concurrency 8
+    python replay_bench.py cassettes/upstream.jsonl.gz --timing drop --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay traffic dari cassette upstream")
+    parser.add_argument('cassette', help="File cassette (.jsonl.gz) hasil UPSTREAM_MODE=record; "
+                                         "file per proses <cassette>.<pid> ikut dibaca")
+    parser.add_argument('--concurrency', type=int, default=4, help="Request paralel (default: 4)")
+    parser.add_argument('--timing', choices=('keep', 'drop'), default='keep',
+                        help="keep = pakai latensi upstream asli, drop = jawab secepatnya")
+    parser.add_argument('--repeat', type=int, default=1, help="Ulangi seluruh traffic N kali")
+    parser.add_argument('--limit', type=int, default=0, help="Batasi jumlah request (0 = semua)")
+    parser.add_argument('--db', default=None,
+                        help="Knowledge DB untuk replay (default: file sementara yang kosong)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Konfigurasi harus diset sebelum app di-import
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='replay-'), 'knowledge_base.db')
+    os.environ.update({
+        'UPSTREAM_MODE': 'replay',
+        'UPSTREAM_CASSETTE': os.path.abspath(args.cassette),
+        'REPLAY_TIMING': args.timing,
+        'KNOWLEDGE_DB': db_path,
+    })
+
+    from cassette import cassette_files, iter_records, KIND_REQUEST
+    if not cassette_files(args.cassette):
+        print(f"❌ Cassette {args.cassette} tidak ditemukan!")
+        return 1
+    requests_log = [r for r in iter_records(args.cassette) if r['kind'] == KIND_REQUEST]
+    if args.limit:
+        requests_log = requests_log[:args.limit]
+    if not requests_log:
+        print("⚠️ Cassette tidak berisi request /api/ask yang terekam")
+        return 1
+
+    import app as app_module
+
+    print("=" * 60)
+    print("📼 UPSTREAM REPLAY BENCHMARK")
+    print("=" * 60)
+    print(f"📋 {len(requests_log)} recorded requests × {args.repeat}, concurrency {args.concurrency}, timing {args.timing}")
+
+    local = threading.local()
+    latencies = []
+    stats = {"errors": 0, "partial": 0}
+    lock = threading.Lock()
+
+    def replay(record):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app_module.app.test_client()
+        data = record['data']
+        headers = {'X-Request-Deadline-Ms': str(data['deadline_ms'])} if data.get('deadline_ms') else {}
+        started = time.perf_counter()
+        response = client.post('/api/ask', json={'question': data['question']}, headers=headers)
+        elapsed = (time.perf_counter() - started) * 1000
+        body = response.get_json(silent=True) or {}
+        with lock:
+            latencies.append(elapsed)
+            if response.status_code != 200 or not body.get('success'):
+                stats["errors"] += 1
+            if body.get('partial'):
+                stats["partial"] += 1
+
+    workload = requests_log * max(1, args.repeat)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        list(executor.map(replay, workload))
+    wall = time.perf_counter() - started
+
+    recorded = [r['ms'] for r in requests_log]
+    cassette_stats = app_module.cassette.stats()
+    print("-" * 60)
+    print(f"⏱️  Throughput: {len(workload) / wall:.2f} req/s ({wall:.2f}s total)")
+    print(f"📊 Latency ms  replay   p50={percentile(latencies, 50):.1f}  p95={percentile(latencies, 95):.1f}  p99={percentile(latencies, 99):.1f}")
+    print(f"📊 Latency ms  recorded p50={percentile(recorded, 50):.1f}  p95={percentile(recorded, 95):.1f}  p99={percentile(recorded, 99):.1f}")
+    print(f"❌ Errors: {stats['errors']}  ⚠️ Partial: {stats['partial']}")
+    print(f"📼 Cassette hits: {cassette_stats['hits']}  misses: {cassette_stats['misses']}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,8 @@ def check_dependencies():
         'requests==2.31.0',
         'beautifulsoup4==4.12.2',
         'sympy==1.12',
+        'orjson==3.9.10',
+        'brotli==1.1.0',
         'python-dotenv==1.0.0',
         'httpx==0.25.2',
         'urllib3==2.0.7',
@@ -90,9 +92,40 @@ AI_TEMPERATURE=0.3
 SEARCH_MAX_RESULTS=8
 SEARCH_TIMEOUT=10
 
+# Request Deadline (bisa di-override per request dengan header X-Request-Deadline-Ms)
+REQUEST_DEADLINE_MS=8000
+REQUEST_DEADLINE_MAX_MS=30000
+UPSTREAM_WORKERS=16
+
+# Knowledge Cache (umur jawaban tersimpan dalam jam; pertanyaan berita/real-time memakai KB_REALTIME_TTL_HOURS)
+KB_ANSWER_TTL_HOURS=168
+KB_REALTIME_TTL_HOURS=3
+KB_MIN_CONFIDENCE=0.5
+
+# Knowledge Base Maintenance (0 = tanpa batas / nonaktif)
+KB_MAX_ROWS=0
+KB_MAX_BYTES=0
+KB_MAINTENANCE_INTERVAL_S=0
+KB_CONTEXT_MAX_AGE_DAYS=30
+
+# HTTP Cache & Kompresi (br jika brotli terpasang, selain itu gzip)
+ANSWER_VERSION=4.0.4
+CACHE_CONTROL_ASK=public, max-age=300, stale-while-revalidate=3600
+CACHE_CONTROL_HEALTH=public, max-age=5, stale-while-revalidate=30
+COMPRESS_MIN_BYTES=1024
+
+# Profiling (header X-Profile: 1 + ADMIN_TOKEN, atau sampling 1 dari N request; 0 = mati)
+PROFILE_SAMPLE_EVERY=0
+PROFILE_MAX_FILES=50
+
+# Upstream Record/Replay (off | record | replay), putar ulang dengan replay_bench.py
+UPSTREAM_MODE=off
+REPLAY_TIMING=keep
+
 # Security
 CORS_ORIGINS=*
 SSL_VERIFY=false
+ADMIN_TOKEN=
 """)
             print(f"✅ {env_file} created successfully")
         except Exception as e:
@@ -121,10 +154,11 @@ def validate_environment():
     
     # Cek Python version
     python_version = sys.version_info
-    if python_version.major == 3 and python_version.minor >= 8:
+    # records.py memakai @dataclass(slots=True)
+    if python_version.major == 3 and python_version.minor >= 10:
         print(f"✅ Python {python_version.major}.{python_version.minor}.{python_version.micro} compatible")
     else:
-        print(f"⚠️ Python {python_version.major}.{python_version.minor} detected - Python 3.8+ recommended")
+        print(f"⚠️ Python {python_version.major}.{python_version.minor} detected - Python 3.10+ required")
     
     # Cek koneksi internet (opsional)
     try:
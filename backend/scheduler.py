@@ -0,0 +1,207 @@
+# scheduler.py
+import os
+import threading
+import time
+import logging
+from collections import deque, OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Nama lane yang dipakai oleh app.py
+LANE_CACHE = 'cache'
+LANE_MATH = 'math'
+LANE_LLM = 'llm'
+
+
+class LaneFullError(Exception):
+    """Dilempar saat antrian sebuah lane sudah penuh"""
+
+
+class Lane:
+    """Satu jalur eksekusi dengan worker, batas konkurensi dan antrian sendiri.
+
+    Antrian dibagi per tenant (mis. session atau alamat IP) dan dilayani
+    secara round-robin, sehingga satu klien yang mengirim banyak pertanyaan
+    tidak bisa memonopoli lane.
+    """
+
+    def __init__(self, name, concurrency, max_queue=0, window=500):
+        self.name = name
+        self.concurrency = max(1, int(concurrency))
+        self.max_queue = max(0, int(max_queue))  # 0 = tanpa batas
+
+        self._cond = threading.Condition()
+        self._tenants = OrderedDict()  # tenant -> deque of (future, fn, args, kwargs, enqueued_at)
+        self._depth = 0
+        self._active = 0
+        self._workers = []
+
+        # Statistik
+        self._waits = deque(maxlen=window)
+        self._runs = deque(maxlen=window)
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._expired = 0
+        self._max_wait = 0.0
+
+    def _ensure_workers(self):
+        # Dipanggil dengan self._cond sudah di-lock
+        if self._workers:
+            return
+        for i in range(self.concurrency):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"lane-{self.name}-{i}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, fn, *args, tenant=None, **kwargs):
+        """Masukkan pekerjaan ke antrian lane, kembalikan Future"""
+        future = Future()
+        with self._cond:
+            if self.max_queue and self._depth >= self.max_queue:
+                self._rejected += 1
+                raise LaneFullError(f"Lane '{self.name}' penuh ({self._depth} antrian)")
+
+            self._ensure_workers()
+            queue = self._tenants.get(tenant)
+            if queue is None:
+                queue = self._tenants[tenant] = deque()
+            queue.append((future, fn, args, kwargs, time.perf_counter()))
+            self._depth += 1
+            self._cond.notify()
+        return future
+
+    def _next_job(self):
+        # Round-robin: ambil dari tenant paling depan lalu pindahkan ke belakang
+        tenant, queue = next(iter(self._tenants.items()))
+        job = queue.popleft()
+        if queue:
+            self._tenants.move_to_end(tenant)
+        else:
+            del self._tenants[tenant]
+        self._depth -= 1
+        return job
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._depth:
+                    self._cond.wait()
+                future, fn, args, kwargs, enqueued_at = self._next_job()
+                self._active += 1
+
+            started = time.perf_counter()
+            wait = started - enqueued_at
+            if not future.set_running_or_notify_cancel():
+                # Pemanggil sudah berhenti menunggu (deadline habis di antrian):
+                # hanya dihitung expired, bukan completed dan tidak masuk statistik wait/run
+                with self._cond:
+                    self._active -= 1
+                    self._expired += 1
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                finished = time.perf_counter()
+                with self._cond:
+                    self._active -= 1
+                    self._waits.append(wait)
+                    self._runs.append(finished - started)
+                    self._max_wait = max(self._max_wait, wait)
+                    if future.exception() is None:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+
+    @staticmethod
+    def _percentile(values, pct):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def stats(self):
+        """Snapshot statistik lane (waktu dalam milidetik)"""
+        with self._cond:
+            waits = list(self._waits)
+            runs = list(self._runs)
+            return {
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "queue_depth": self._depth,
+                "active": self._active,
+                "tenants_waiting": len(self._tenants),
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "expired": self._expired,
+                "wait_ms": {
+                    "avg": round(sum(waits) / len(waits) * 1000, 3) if waits else 0.0,
+                    "p50": round(self._percentile(waits, 50) * 1000, 3),
+                    "p95": round(self._percentile(waits, 95) * 1000, 3),
+                    "max": round(self._max_wait * 1000, 3),
+                },
+                "run_ms": {
+                    "avg": round(sum(runs) / len(runs) * 1000, 3) if runs else 0.0,
+                    "p95": round(self._percentile(runs, 95) * 1000, 3),
+                },
+            }
+
+
+class PriorityScheduler:
+    """Scheduler dengan lane terpisah: lookup knowledge base, matematika, dan search/LLM.
+
+    Setiap lane punya worker sendiri, jadi lane LLM yang penuh tidak pernah
+    menahan pertanyaan murah di lane cache atau matematika.
+    """
+
+    def __init__(self, lanes):
+        self.lanes = {lane.name: lane for lane in lanes}
+
+    def submit(self, lane_name, fn, *args, tenant=None, **kwargs):
+        lane = self.lanes.get(lane_name)
+        if lane is None:
+            raise KeyError(f"Lane tidak dikenal: {lane_name}")
+        return lane.submit(fn, *args, tenant=tenant, **kwargs)
+
+    def run(self, lane_name, fn, *args, tenant=None, timeout=None, **kwargs):
+        """Submit lalu tunggu hasilnya (dipakai oleh handler Flask).
+
+        Jika timeout habis, pekerjaan yang masih di antrian dibatalkan dan
+        FutureTimeoutError dilempar ulang.
+        """
+        future = self.submit(lane_name, fn, *args, tenant=tenant, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def stats(self):
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+
+def create_default_scheduler():
+    """Buat scheduler dari konfigurasi .env"""
+    def env_int(key, default):
+        try:
+            return int(os.getenv(key, default))
+        except ValueError:
+            return default
+
+    scheduler = PriorityScheduler([
+        Lane(LANE_CACHE, env_int('LANE_CACHE_CONCURRENCY', 8), env_int('LANE_CACHE_MAX_QUEUE', 0)),
+        Lane(LANE_MATH, env_int('LANE_MATH_CONCURRENCY', 4), env_int('LANE_MATH_MAX_QUEUE', 0)),
+        Lane(LANE_LLM, env_int('LANE_LLM_CONCURRENCY', 4), env_int('LANE_LLM_MAX_QUEUE', 64)),
+    ])
+    logger.info("✅ Priority Scheduler Initialized: " + ", ".join(
+        f"{name}={lane.concurrency}" for name, lane in scheduler.lanes.items()))
+    return scheduler
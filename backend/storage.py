@@ -0,0 +1,595 @@
+# storage.py
+import os
+import time
+import queue
+import sqlite3
+import logging
+import threading
+import atexit
+import json
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS knowledge (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question_hash TEXT UNIQUE,
+        question TEXT,
+        answer TEXT,
+        sources TEXT,
+        confidence REAL,
+        usage_count INTEGER DEFAULT 0,
+        last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS conversation_context (
+        session_id TEXT,
+        question TEXT,
+        answer TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_context_session_time ON conversation_context (session_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_context_time ON conversation_context (timestamp)",
+    # Urutan eviction: yang tidak bisa dilayani lagi, lalu paling lama tidak dipakai (LRU)
+    "CREATE INDEX IF NOT EXISTS idx_knowledge_last_used ON knowledge (last_used)",
+]
+
+# Pragma untuk setiap koneksi (WAL diset sekali di _init_schema)
+CONNECTION_PRAGMAS = [
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",        # ~8 MB page cache per koneksi
+    "PRAGMA mmap_size = 134217728",     # 128 MB memory-mapped I/O
+    "PRAGMA foreign_keys = OFF",
+]
+
+# created_at = waktu jawaban yang tersimpan dibuat (ikut diperbarui saat jawaban diganti),
+# dipakai untuk TTL jawaban
+UPSERT_KNOWLEDGE = """
+    INSERT INTO knowledge (question_hash, question, answer, sources, confidence, last_used, created_at)
+    VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?6)
+    ON CONFLICT(question_hash) DO UPDATE SET
+        answer = excluded.answer,
+        sources = excluded.sources,
+        confidence = excluded.confidence,
+        last_used = excluded.last_used,
+        created_at = excluded.created_at
+"""
+
+# Jawaban yang diawali penanda ini adalah pesan error, bukan jawaban
+ERROR_ANSWER_PREFIX = '❌'
+
+# Migrasi data, dijalankan sekali per database (PRAGMA user_version = jumlah migrasi terpasang)
+MIGRATIONS = [
+    # 1: pesan error Gemini (mis. "❌ **Error AI:** 404 models/gemini-pro ...") pernah tersimpan sebagai jawaban
+    f"DELETE FROM knowledge WHERE answer LIKE '{ERROR_ANSWER_PREFIX}%'",
+    # 2: urutan eviction berubah ke LRU (idx_knowledge_last_used)
+    "DROP INDEX IF EXISTS idx_knowledge_eviction",
+]
+
+# Baris yang masih boleh dilayani: confidence cukup, bukan pesan error, belum melewati TTL.
+# Parameter: (min_confidence, max_age_s, "-<max_age_s> seconds"), lihat _servable_params
+SERVABLE = f"""(confidence >= ? AND answer NOT LIKE '{ERROR_ANSWER_PREFIX}%'
+               AND (? = 0 OR created_at >= datetime('now', ?)))"""
+
+BUMP_USAGE = """
+    UPDATE knowledge SET usage_count = usage_count + ?, last_used = ?
+    WHERE question_hash = ?
+"""
+
+IMPORT_KNOWLEDGE = """
+    INSERT INTO knowledge (question_hash, question, answer, sources, confidence, usage_count, last_used, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, CURRENT_TIMESTAMP))
+    ON CONFLICT(question_hash) DO UPDATE SET
+        answer = CASE WHEN excluded.last_used >= knowledge.last_used THEN excluded.answer ELSE knowledge.answer END,
+        sources = CASE WHEN excluded.last_used >= knowledge.last_used THEN excluded.sources ELSE knowledge.sources END,
+        -- created_at adalah umur (TTL) dan versi (ETag) jawaban, jadi ikut jawaban yang dipilih
+        created_at = CASE WHEN excluded.last_used >= knowledge.last_used THEN excluded.created_at ELSE knowledge.created_at END,
+        confidence = MAX(knowledge.confidence, excluded.confidence),
+        usage_count = MAX(knowledge.usage_count, excluded.usage_count),
+        last_used = MAX(knowledge.last_used, excluded.last_used)
+"""
+
+EXPORT_COLUMNS = ('question_hash', 'question', 'answer', 'sources', 'confidence',
+                  'usage_count', 'last_used', 'created_at')
+
+# Perkiraan ukuran data tabel knowledge (byte), tanpa conversation_context.
+# 64 byte per baris untuk hash, angka, timestamp dan overhead record.
+KNOWLEDGE_BYTES = """
+    SELECT COUNT(*), COALESCE(SUM(
+        LENGTH(CAST(question AS BLOB)) + LENGTH(CAST(answer AS BLOB)) + LENGTH(CAST(sources AS BLOB)) + 64
+    ), 0) FROM knowledge
+"""
+
+INSERT_CONTEXT = """
+    INSERT INTO conversation_context (session_id, question, answer, timestamp)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Jenis operasi untuk writer thread
+_OP_UPSERT = 'upsert'
+_OP_USAGE = 'usage'
+_OP_CONTEXT = 'context'
+_OP_FLUSH = 'flush'
+
+
+def _timestamp():
+    # Format yang sama dengan CURRENT_TIMESTAMP milik SQLite (UTC)
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+
+class KnowledgeStore:
+    """Akses knowledge_base.db yang aman untuk banyak thread.
+
+    - Mode WAL: pembaca tidak pernah menunggu penulis
+    - Pool koneksi baca yang dipakai ulang (dibatasi read_pool_size), karena
+      server Flask membuat thread baru untuk setiap request
+    - Satu writer thread di background yang mengumpulkan insert dan
+      penambahan usage_count lalu menulisnya dalam satu transaksi berkala
+    """
+
+    def __init__(self, db_path, flush_interval=0.5, batch_size=500, busy_timeout_ms=5000,
+                 max_rows=0, max_bytes=0, maintenance_interval=0, read_pool_size=8,
+                 context_max_age_days=0, answer_ttl_s=0, min_confidence=0.0):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.busy_timeout_ms = busy_timeout_ms
+
+        # Budget knowledge base (0 = tanpa batas) dan interval maintenance otomatis
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.maintenance_interval = maintenance_interval
+        self.context_max_age_days = context_max_age_days
+        # Jawaban lebih tua dari answer_ttl_s (0 = tanpa batas) atau di bawah min_confidence tidak dilayani
+        self.answer_ttl_s = answer_ttl_s
+        self.min_confidence = min_confidence
+
+        self._read_pool = queue.LifoQueue()
+        self._read_slots = threading.BoundedSemaphore(max(1, read_pool_size))
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writes_committed = 0
+        self._batches_committed = 0
+
+        self._init_schema()
+        self._writer = threading.Thread(target=self._writer_loop, name="knowledge-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------ koneksi
+
+    def _connect(self, readonly=False):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            isolation_level=None,          # transaksi dikelola manual
+            check_same_thread=False
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        try:
+            mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            if mode.lower() != 'wal':
+                logger.warning(f"⚠️ SQLite WAL mode not available, using {mode}")
+            for statement in SCHEMA:
+                conn.execute(statement)
+            self._migrate(conn)
+        finally:
+            conn.close()
+
+    def _migrate(self, conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statement in enumerate(MIGRATIONS[version:], version + 1):
+            with self._transaction(conn):
+                cursor = conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+            rows = f" ({cursor.rowcount} rows)" if cursor.rowcount >= 0 else ""
+            logger.info(f"🔧 Knowledge base migration {number} applied{rows}")
+
+    @contextmanager
+    def _writer_connection(self, conn=None):
+        """Pakai koneksi yang diberikan, atau buka koneksi tulis sementara"""
+        if conn is not None:
+            yield conn
+            return
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    @contextmanager
+    def _transaction(conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def _reader(self):
+        """Pinjam koneksi baca dari pool; koneksi baru hanya dibuka jika pool masih kosong"""
+        with self._read_slots:
+            try:
+                conn = self._read_pool.get_nowait()
+            except queue.Empty:
+                conn = self._connect(readonly=True)
+            try:
+                yield conn
+            finally:
+                self._read_pool.put(conn)
+
+    # -------------------------------------------------------------------- baca
+
+    def _servable_params(self, max_age_s=None, min_confidence=None):
+        max_age_s = int(self.answer_ttl_s if max_age_s is None else max_age_s)
+        min_confidence = self.min_confidence if min_confidence is None else min_confidence
+        return (min_confidence, max_age_s, f"-{max_age_s} seconds")
+
+    def get_knowledge(self, question_hash, max_age_s=None, min_confidence=None):
+        """Ambil (answer, sources, confidence, created_at) untuk hash pertanyaan, atau None.
+
+        Jawaban yang lebih tua dari max_age_s (default answer_ttl_s, 0 = tanpa batas),
+        confidence di bawah min_confidence, atau berisi pesan error dianggap tidak ada.
+        """
+        with self._reader() as conn:
+            return conn.execute(
+                f"""SELECT answer, sources, confidence, created_at FROM knowledge
+                   WHERE question_hash = ? AND {SERVABLE}""",
+                (question_hash,) + self._servable_params(max_age_s, min_confidence)
+            ).fetchone()
+
+    def get_context(self, session_id, limit=5):
+        """Ambil percakapan terakhir sebuah session (terbaru di akhir)"""
+        with self._reader() as conn:
+            rows = conn.execute(
+                """SELECT question, answer FROM conversation_context
+                   WHERE session_id = ? ORDER BY timestamp DESC LIMIT ?""",
+                (session_id, limit)
+            ).fetchall()
+        return rows[::-1]
+
+    def existing_hashes(self, question_hashes, max_age_s=None, min_confidence=None):
+        """Kembalikan subset hash yang jawabannya masih bisa dilayani get_knowledge.
+
+        Filter kedaluwarsa/confidence/error sama dengan get_knowledge, jadi baris
+        yang basi tidak dianggap sudah ada (mis. saat resume warm_cache.py).
+        """
+        found = set()
+        question_hashes = list(question_hashes)
+        servable = self._servable_params(max_age_s, min_confidence)
+        with self._reader() as conn:
+            for i in range(0, len(question_hashes), 500):
+                chunk = question_hashes[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(row[0] for row in conn.execute(
+                    f"""SELECT question_hash FROM knowledge
+                       WHERE question_hash IN ({placeholders}) AND {SERVABLE}""",
+                    tuple(chunk) + servable))
+        return found
+
+    # ------------------------------------------------------------------- tulis
+
+    def save_knowledge(self, question_hash, question, answer, sources, confidence):
+        """Antrikan jawaban; kembalikan timestamp yang akan menjadi created_at-nya"""
+        timestamp = _timestamp()
+        self._enqueue((_OP_UPSERT, (question_hash, question, answer, sources, confidence, timestamp)))
+        return timestamp
+
+    def record_usage(self, question_hash):
+        self._enqueue((_OP_USAGE, question_hash))
+
+    def append_context(self, session_id, question, answer):
+        self._enqueue((_OP_CONTEXT, (session_id, question, answer, _timestamp())))
+
+    def _enqueue(self, op):
+        if self._closed:
+            logger.warning("⚠️ Knowledge store closed, write dropped")
+            return
+        self._queue.put(op)
+
+    def bulk_save_knowledge(self, rows):
+        """Simpan banyak (question_hash, question, answer, sources, confidence) dalam satu transaksi.
+
+        Berjalan sinkron di thread pemanggil, dipakai oleh tool batch seperti warm_cache.py.
+        """
+        rows = [tuple(row) + (_timestamp(),) for row in rows]
+        if not rows:
+            return 0
+        with self._writer_connection() as conn, self._transaction(conn):
+            conn.executemany(UPSERT_KNOWLEDGE, rows)
+        return len(rows)
+
+    def flush(self, timeout=10):
+        """Tunggu sampai semua tulisan yang sudah diantrikan ter-commit"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put((_OP_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+        while True:
+            try:
+                self._read_pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    # ------------------------------------------------------------ writer thread
+
+    def _collect_batch(self, first):
+        """Ambil operasi sampai batch_size atau flush_interval habis"""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                op = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(op)
+            if op is None or op[0] == _OP_FLUSH:
+                break
+        return batch
+
+    def _write_batch(self, conn, batch):
+        upserts = {}
+        usage = {}
+        contexts = []
+        for kind, payload in batch:
+            if kind == _OP_UPSERT:
+                upserts[payload[0]] = payload      # upsert terakhir yang menang
+            elif kind == _OP_USAGE:
+                count, _ = usage.get(payload, (0, None))
+                usage[payload] = (count + 1, _timestamp())
+            elif kind == _OP_CONTEXT:
+                contexts.append(payload)
+
+        if not (upserts or usage or contexts):
+            return
+
+        with self._transaction(conn):
+            if upserts:
+                conn.executemany(UPSERT_KNOWLEDGE, upserts.values())
+            if usage:
+                conn.executemany(BUMP_USAGE, ((count, ts, h) for h, (count, ts) in usage.items()))
+            if contexts:
+                conn.executemany(INSERT_CONTEXT, contexts)
+        self._writes_committed += len(upserts) + len(usage) + len(contexts)
+        self._batches_committed += 1
+
+    def _writer_loop(self):
+        conn = self._connect()
+        next_maintenance = time.monotonic() + self.maintenance_interval
+        try:
+            while True:
+                if self.maintenance_interval and time.monotonic() >= next_maintenance:
+                    self._run_maintenance(conn)
+                    next_maintenance = time.monotonic() + self.maintenance_interval
+                try:
+                    timeout = max(0.0, next_maintenance - time.monotonic()) if self.maintenance_interval else None
+                    first = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    continue
+                if first is None:
+                    break
+                batch = self._collect_batch(first)
+
+                stop = any(op is None for op in batch)
+                events = [op[1] for op in batch if op is not None and op[0] == _OP_FLUSH]
+                writes = [op for op in batch if op is not None and op[0] != _OP_FLUSH]
+                try:
+                    self._write_batch(conn, writes)
+                except sqlite3.Error as e:
+                    logger.error(f"❌ Knowledge writer batch failed ({len(writes)} ops): {e}")
+                for event in events:
+                    event.set()
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _run_maintenance(self, conn):
+        """Eviction, pruning conversation_context + incremental vacuum berkala, di writer thread"""
+        try:
+            result = self.evict(conn=conn)
+            pruned = self.prune_context(self.context_max_age_days, conn=conn) if self.context_max_age_days else {"deleted": 0}
+            if result["deleted"] or pruned["deleted"]:
+                self.incremental_vacuum(conn=conn)
+                logger.info(f"🧹 Knowledge maintenance: evicted {result['deleted']} entries, "
+                            f"pruned {pruned['deleted']} context rows")
+        except sqlite3.Error as e:
+            logger.error(f"❌ Knowledge maintenance failed: {e}")
+
+    # ------------------------------------------------------------- maintenance
+
+    def db_stats(self, conn=None):
+        """Jumlah baris dan ukuran file database"""
+        if conn is None:
+            with self._reader() as conn:
+                return self.db_stats(conn)
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        knowledge_rows, knowledge_bytes = conn.execute(KNOWLEDGE_BYTES).fetchone()
+        return {
+            "knowledge_rows": knowledge_rows,
+            "knowledge_bytes": knowledge_bytes,
+            "context_rows": conn.execute("SELECT COUNT(*) FROM conversation_context").fetchone()[0],
+            "file_bytes": page_size * page_count,
+            "used_bytes": page_size * (page_count - freelist),
+            "free_pages": freelist,
+            "incremental_vacuum": auto_vacuum == 2,
+        }
+
+    def evict(self, max_rows=None, max_bytes=None, chunk_size=200, conn=None):
+        """Hapus entri bernilai terendah sampai jumlah baris/ukuran di bawah budget.
+
+        max_bytes membatasi ukuran data tabel knowledge saja (lihat KNOWLEDGE_BYTES);
+        conversation_context dibatasi lewat prune_context.
+
+        Urutan: baris yang tidak akan dilayani lagi (lewat TTL, confidence rendah, error),
+        lalu last_used terlama (LRU), lalu usage_count terkecil.
+        """
+        max_rows = self.max_rows if max_rows is None else max_rows
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        deleted = 0
+        with self._writer_connection(conn) as conn:
+            if max_rows:
+                total = conn.execute("SELECT COUNT(*) FROM knowledge").fetchone()[0]
+                while total > max_rows:
+                    count = min(chunk_size, total - max_rows)
+                    deleted += self._delete_lowest(conn, count)
+                    total -= count
+
+            if max_bytes:
+                while True:
+                    rows, used = conn.execute(KNOWLEDGE_BYTES).fetchone()
+                    if used <= max_bytes or not rows:
+                        break
+                    # Perkirakan jumlah baris dari rata-rata ukuran per baris
+                    estimate = -(-(used - max_bytes) * rows // used)
+                    removed = self._delete_lowest(conn, max(1, min(chunk_size, estimate)))
+                    if not removed:
+                        break
+                    deleted += removed
+        return {"deleted": deleted}
+
+    def _delete_lowest(self, conn, count):
+        # Chunk kecil per transaksi supaya writer thread tidak tertahan lama
+        with self._transaction(conn):
+            cursor = conn.execute(
+                f"""DELETE FROM knowledge WHERE id IN (
+                       SELECT id FROM knowledge
+                       ORDER BY {SERVABLE} ASC, last_used ASC, usage_count ASC
+                       LIMIT ?)""",
+                self._servable_params() + (count,)
+            )
+        return cursor.rowcount
+
+    def prune_context(self, max_age_days, conn=None):
+        """Hapus conversation_context yang lebih tua dari max_age_days"""
+        with self._writer_connection(conn) as conn, self._transaction(conn):
+            cursor = conn.execute(
+                "DELETE FROM conversation_context WHERE timestamp < datetime('now', ?)",
+                (f"-{int(max_age_days)} days",)
+            )
+        return {"deleted": cursor.rowcount}
+
+    def incremental_vacuum(self, pages=0, conn=None):
+        """Kembalikan halaman kosong ke filesystem tanpa VACUUM penuh.
+
+        Database lama (auto_vacuum=NONE) dikonversi sekali dengan VACUUM.
+        """
+        with self._writer_connection(conn) as conn:
+            before = conn.execute("PRAGMA page_count").fetchone()[0]
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                logger.info("🔧 Converting knowledge base to auto_vacuum=INCREMENTAL (one-time VACUUM)")
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            else:
+                # Lewat execute() sqlite3 hanya menjalankan satu langkah (satu halaman);
+                # executescript menjalankan pragma sampai selesai
+                conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+            after = conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return {"freed_bytes": (before - after) * page_size, "file_bytes": after * page_size}
+
+    def export_jsonl(self, fp):
+        """Tulis tabel knowledge sebagai JSONL ke file object, baris demi baris"""
+        count = 0
+        for line in self.iter_export():
+            fp.write(line)
+            count += 1
+        return count
+
+    def iter_export(self):
+        """Generator baris JSONL; tidak memuat seluruh tabel ke memori"""
+        conn = self._connect(readonly=True)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM knowledge ORDER BY id")
+            for row in cursor:
+                yield json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+        finally:
+            conn.close()
+
+    def import_jsonl(self, fp, batch_size=500):
+        """Baca JSONL hasil export dan upsert per batch transaksi.
+
+        Untuk hash yang sudah ada, jawaban yang lebih baru (last_used) yang dipakai
+        dan usage_count/confidence diambil nilai terbesarnya.
+        """
+        imported = skipped = 0
+        batch = []
+        with self._writer_connection() as conn:
+            for line in fp:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    batch.append((
+                        record['question_hash'], record.get('question'), record['answer'],
+                        record.get('sources') or '[]', float(record.get('confidence') or 0),
+                        int(record.get('usage_count') or 0), record.get('last_used'), record.get('created_at')
+                    ))
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+                    continue
+                if len(batch) >= batch_size:
+                    with self._transaction(conn):
+                        conn.executemany(IMPORT_KNOWLEDGE, batch)
+                    imported += len(batch)
+                    batch = []
+            if batch:
+                with self._transaction(conn):
+                    conn.executemany(IMPORT_KNOWLEDGE, batch)
+                imported += len(batch)
+        return {"imported": imported, "skipped": skipped}
+
+    def stats(self):
+        return {
+            "pending_writes": self._queue.qsize(),
+            "idle_readers": self._read_pool.qsize(),
+            "writes_committed": self._writes_committed,
+            "batches_committed": self._batches_committed,
+        }
+
+
+def create_knowledge_store(db_path):
+    """Buat KnowledgeStore dengan konfigurasi dari .env"""
+    store = KnowledgeStore(
+        db_path,
+        flush_interval=int(os.getenv('KB_FLUSH_INTERVAL_MS', '500')) / 1000.0,
+        batch_size=int(os.getenv('KB_BATCH_SIZE', '500')),
+        max_rows=int(os.getenv('KB_MAX_ROWS', '0')),
+        max_bytes=int(os.getenv('KB_MAX_BYTES', '0')),
+        maintenance_interval=int(os.getenv('KB_MAINTENANCE_INTERVAL_S', '0')),
+        context_max_age_days=int(os.getenv('KB_CONTEXT_MAX_AGE_DAYS', '30')),
+        answer_ttl_s=int(float(os.getenv('KB_ANSWER_TTL_HOURS', '168')) * 3600),
+        min_confidence=float(os.getenv('KB_MIN_CONFIDENCE', '0.5')),
+        read_pool_size=int(os.getenv('KB_READ_POOL_SIZE', '8'))
+    )
+    logger.info(f"✅ Knowledge Store Initialized (WAL): {db_path}")
+    return store
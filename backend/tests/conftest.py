@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul backend diimport langsung (tanpa package), sama seperti app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+import math_engine
+
+
+def test_arithmetic():
+    assert math_engine.solve_problem("hitung 25 × 4 + 100 ÷ 2") == "**Jawaban Matematika:**\n\n`25 * 4 + 100 / 2` = `150`"
+
+
+@pytest.mark.parametrize("question", [
+    "hitung ((9^999)^999)^3",
+    "hitung ((9^999)^999)^999",
+    "hitung 99999999999^999 * 99999999999^999",
+])
+def test_huge_numbers_rejected_quickly(question):
+    started = time.perf_counter()
+    assert math_engine.solve_problem(question) is None
+    assert time.perf_counter() - started < 0.5
+
+
+@pytest.mark.parametrize("question", [
+    "x^9999999 = 1",
+    "x**9999999 = 1",
+    "(x+1)^10^10 = 0",
+    "((((x^10)^10)^10)^10) = 1",
+    "(x+1)^10 * (x+2)^10 = 0",
+])
+def test_high_degree_equation_rejected_quickly(question):
+    started = time.perf_counter()
+    assert math_engine.solve_problem(question) is None
+    assert time.perf_counter() - started < 0.5
+
+
+def test_quadratic_equation():
+    assert math_engine.solve_problem("x^2 - 4 = 0").endswith("**x = 2, -2**")
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("berapa 3,5 + 1,2", "`3.5 + 1.2` = `4.7`"),
+    ("hitung 2,5 × 4", "`2.5 * 4` = `10`"),
+    ("berapa 12/4", "`12/4` = `3`"),
+])
+def test_arithmetic_decimal_comma(question, expected):
+    assert math_engine.solve_problem(question).endswith(expected)
+
+
+@pytest.mark.parametrize("question", [
+    "skor pertandingan 2-1",
+    "berapa skor pertandingan 2-1 kemarin",
+    "buka 24/7 jam",
+    "covid-19 di indonesia 2020-2021",
+])
+def test_no_math_intent(question):
+    assert not math_engine.has_math_intent(question)
@@ -0,0 +1,186 @@
+# warm_cache.py
+"""Isi tabel knowledge sebelum server menerima traffic.
+
+Contoh:
+    python warm_cache.py questions.txt
+    python warm_cache.py questions.jsonl --concurrency 2 --rpm 15 --batch-size 20
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import json_codec
+from records import AskResponse
+
+
+class RateLimiter:
+    """Token bucket sederhana: maksimal `rate_per_minute` panggilan per menit"""
+
+    def __init__(self, rate_per_minute, burst=1):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.interval
+            time.sleep(wait)
+
+
+def load_questions(path):
+    """Baca pertanyaan dari file JSONL ({"question": ...} per baris) atau teks biasa"""
+    questions = []
+    is_jsonl = path.endswith('.jsonl') or path.endswith('.ndjson')
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if is_jsonl:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"⚠️ Line {line_number}: invalid JSON ({e}), skipped")
+                    continue
+                question = record.get('question', '') if isinstance(record, dict) else str(record)
+            else:
+                question = line
+            question = question.strip()
+            if question:
+                questions.append(question)
+    return questions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-warm knowledge_base.db dengan daftar pertanyaan")
+    parser.add_argument('input', help="File .jsonl ({\"question\": ...}) atau .txt (satu pertanyaan per baris)")
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv('WARM_CONCURRENCY', '2')),
+                        help="Jumlah pertanyaan yang diproses bersamaan (default: 2)")
+    parser.add_argument('--rpm', type=float, default=float(os.getenv('WARM_GEMINI_RPM', '15')),
+                        help="Batas request Gemini per menit, 0 = tanpa batas (default: 15)")
+    parser.add_argument('--burst', type=int, default=1,
+                        help="Jumlah request yang boleh dikirim sekaligus sebelum rate limit berlaku")
+    parser.add_argument('--batch-size', type=int, default=20,
+                        help="Jumlah jawaban per transaksi insert (default: 20)")
+    parser.add_argument('--force', action='store_true',
+                        help="Proses ulang pertanyaan yang sudah ada di knowledge base")
+    parser.add_argument('--allow-fallback', action='store_true',
+                        help="Tetap simpan jawaban walaupun Gemini tidak tersedia")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if not os.path.exists(args.input):
+        print(f"❌ File {args.input} tidak ditemukan!")
+        return 1
+
+    questions = load_questions(args.input)
+    print("=" * 60)
+    print("🔥 KNOWLEDGE BASE CACHE WARMER")
+    print("=" * 60)
+    print(f"📋 {len(questions)} questions loaded from {args.input}")
+
+    # Import app setelah argumen valid, karena inisialisasi Gemini butuh waktu
+    from app import ai_system, knowledge_store
+
+    if not ai_system.gemini_model and not args.allow_fallback:
+        print("❌ Gemini AI tidak tersedia - jawaban fallback tidak akan di-cache.")
+        print("💡 Cek GEMINI_API_KEY di .env atau gunakan --allow-fallback")
+        return 1
+
+    # Deduplikasi berdasarkan question_hash, lalu lewati yang sudah ada (resume)
+    pending = {}
+    for question in questions:
+        pending.setdefault(ai_system._question_hash(question), question)
+    duplicates = len(questions) - len(pending)
+    done = set()
+    if not args.force:
+        # Pertanyaan real-time punya TTL lebih pendek, cek sesuai TTL masing-masing
+        by_ttl = {}
+        for question_hash, question in pending.items():
+            by_ttl.setdefault(ai_system._answer_ttl(question), []).append(question_hash)
+        for max_age_s, hashes in by_ttl.items():
+            done |= knowledge_store.existing_hashes(hashes, max_age_s=max_age_s)
+    todo = [(h, q) for h, q in pending.items() if h not in done]
+
+    print(f"♻️  {duplicates} duplicates, {len(done)} already cached, {len(todo)} to process")
+    if not todo:
+        print("✅ Nothing to do")
+        return 0
+
+    limiter = RateLimiter(args.rpm, args.burst)
+    batch = []
+    stats = {"saved": 0, "skipped": 0, "failed": 0}
+    started = time.time()
+
+    def warm(question):
+        limiter.acquire()
+        return ai_system.process_question(question, remember=False)
+
+    def flush_batch():
+        if batch:
+            stats["saved"] += knowledge_store.bulk_save_knowledge(batch)
+            batch.clear()
+
+    executor = ThreadPoolExecutor(max_workers=max(1, args.concurrency))
+    futures = {}
+    try:
+        futures = {executor.submit(warm, q): (h, q) for h, q in todo}
+        for index, future in enumerate(as_completed(futures), 1):
+            question_hash, question = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = AskResponse(success=False, question=question, answer="", error=str(e))
+
+            if not result.success:
+                stats["failed"] += 1
+                print(f"❌ [{index}/{len(todo)}] {question[:60]} - {result.error}")
+                continue
+            # ai_available hanya berarti model ada; quota/error Gemini menghasilkan jawaban fallback
+            if not result.gemini_answered and not args.allow_fallback:
+                stats["skipped"] += 1
+                print(f"⚠️ [{index}/{len(todo)}] {question[:60]} - fallback answer, not cached")
+                continue
+
+            confidence = 0.9 if result.gemini_answered else 0.5
+            batch.append((question_hash, question, result.answer,
+                          json_codec.dumps_text(result.search_results), confidence))
+            print(f"✅ [{index}/{len(todo)}] {question[:60]}")
+            if len(batch) >= args.batch_size:
+                flush_batch()
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted - saving finished answers, run again to resume")
+        for future in futures:
+            future.cancel()
+    finally:
+        executor.shutdown(wait=True)
+        flush_batch()
+
+    elapsed = time.time() - started
+    print("=" * 60)
+    print(f"💾 Saved: {stats['saved']}  ⚠️ Skipped: {stats['skipped']}  ❌ Failed: {stats['failed']}")
+    print(f"⏱️  {elapsed:.1f}s ({stats['saved'] / elapsed if elapsed else 0:.2f} answers/s)")
+    print("=" * 60)
+    return 0 if not stats["failed"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())